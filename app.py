@@ -4,18 +4,18 @@ Cantilan Water Refill Station Management System
 """
 
 import streamlit as st
+import functools
+import importlib
+import io
 import os
+import time
 from datetime import datetime, date
 from hydrohub.db import init_db
-from hydrohub.auth import authenticate_user, is_session_valid, get_user_permissions
+from hydrohub.auth import authenticate_user, is_session_valid, get_user_permissions, Perm
 from hydrohub.ui_components import (
     show_header, show_user_info, show_logout_button, show_navigation_menu,
     show_error_message, show_success_message
 )
-from hydrohub.utils import get_current_time
-
-# Initialize database
-init_db()
 
 # Streamlit configuration
 st.set_page_config(
@@ -25,6 +25,15 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+@st.cache_resource(show_spinner=False)
+def _bootstrap_db():
+    """Initialize the database once per server process, not on every rerun"""
+    init_db()
+    return True
+
+# Initialize database
+_bootstrap_db()
+
 # Initialize session state
 if 'user' not in st.session_state:
     st.session_state.user = None
@@ -56,7 +65,7 @@ def show_login_page():
                         'role': user.role,
                         'last_login': user.last_login
                     }
-                    st.session_state.login_time = get_current_time()
+                    st.session_state.login_time = time.time()
                     show_success_message(f"Welcome back, {user.username}!")
                     st.rerun()
                 else:
@@ -87,11 +96,70 @@ def check_session_validity():
     
     return True
 
+@functools.cache
+def _plt():
+    """Import pyplot once, on first chart render"""
+    import matplotlib.pyplot as plt
+    return plt
+
+@functools.cache
+def _load_page(module_name, func_name):
+    """Import a page module on first visit and return its entry point"""
+    return getattr(importlib.import_module(module_name), func_name)
+
+@st.cache_data(ttl=60)
+def _cached_daily_sales(days):
+    """Daily sales data, cached across reruns"""
+    from hydrohub.reports import get_daily_sales_data
+    return get_daily_sales_data(days)
+
+@st.cache_data(ttl=60)
+def _cached_inventory_report():
+    """Inventory report, cached across reruns"""
+    from hydrohub.reports import get_inventory_report
+    return get_inventory_report()
+
+@st.cache_data(ttl=60)
+def _cached_profit_loss_report(start_date, end_date):
+    """P&L report for a date range, cached across reruns"""
+    from hydrohub.reports import get_profit_loss_report
+    return get_profit_loss_report(start_date, end_date)
+
+@st.cache_data(ttl=60)
+def _render_line_png(dates: tuple, revenues: tuple) -> bytes:
+    """Render the daily revenue chart to PNG bytes"""
+    plt = _plt()
+    
+    fig, ax = plt.subplots()
+    try:
+        ax.plot(dates, revenues, marker='o')
+        ax.set_title('Daily Revenue')
+        ax.set_ylabel('Revenue (₱)')
+        ax.tick_params(axis='x', labelrotation=45)
+        buf = io.BytesIO()
+        fig.savefig(buf, format='png', bbox_inches='tight')
+        return buf.getvalue()
+    finally:
+        plt.close(fig)
+
+@st.cache_data(ttl=60)
+def _render_pie_png(labels: tuple, values: tuple) -> bytes:
+    """Render the inventory value pie chart to PNG bytes"""
+    plt = _plt()
+    
+    fig, ax = plt.subplots()
+    try:
+        ax.pie(values, labels=labels, autopct='%1.1f%%')
+        ax.set_title('Inventory Value by Category')
+        buf = io.BytesIO()
+        fig.savefig(buf, format='png', bbox_inches='tight')
+        return buf.getvalue()
+    finally:
+        plt.close(fig)
+
 def show_dashboard(user, permissions):
     """Show dashboard page"""
-    from hydrohub.reports import get_daily_sales_data, get_inventory_report
     from hydrohub.utils import format_money
-    import matplotlib.pyplot as plt
     
     st.header("📊 Dashboard")
     
@@ -99,7 +167,7 @@ def show_dashboard(user, permissions):
     col1, col2, col3, col4 = st.columns(4)
     
     # Get today's data
-    daily_data = get_daily_sales_data(1)
+    daily_data = _cached_daily_sales(1)
     today_data = daily_data[0] if daily_data else {'revenue': 0, 'gallons': 0, 'expenses': 0, 'profit': 0}
     
     with col1:
@@ -116,29 +184,21 @@ def show_dashboard(user, permissions):
     
     with col1:
         st.subheader("📈 Last 7 Days Sales")
-        weekly_data = get_daily_sales_data(7)
+        weekly_data = _cached_daily_sales(7)
         if weekly_data:
             dates = [d['date'].strftime('%m-%d') for d in weekly_data]
             revenues = [d['revenue'] for d in weekly_data]
             
-            fig, ax = plt.subplots()
-            ax.plot(dates, revenues, marker='o')
-            ax.set_title('Daily Revenue')
-            ax.set_ylabel('Revenue (₱)')
-            plt.xticks(rotation=45)
-            st.pyplot(fig)
+            st.image(_render_line_png(tuple(dates), tuple(revenues)))
     
     with col2:
         st.subheader("📦 Inventory Status")
-        inventory_report = get_inventory_report()
-        if inventory_report['all_items']:
+        inventory_report = _cached_inventory_report()
+        if inventory_report['category_breakdown']:
             categories = list(inventory_report['category_breakdown'].keys())
             values = [inventory_report['category_breakdown'][cat]['value'] for cat in categories]
             
-            fig, ax = plt.subplots()
-            ax.pie(values, labels=categories, autopct='%1.1f%%')
-            ax.set_title('Inventory Value by Category')
-            st.pyplot(fig)
+            st.image(_render_pie_png(tuple(categories), tuple(values)))
 
 def show_simple_refill_page(user, permissions):
     """Simple refill recording page"""
@@ -194,13 +254,14 @@ def show_simple_refill_page(user, permissions):
                     transaction = RefillTransaction(**validated_data)
                     session.add(transaction)
                     session.commit()
-                    session.refresh(transaction)
+                    _cached_daily_sales.clear()
                     
                     # Log to ledger
                     log_refill_transaction(
                         actor_id=user['id'],
                         transaction_id=transaction.id,
-                        transaction_data=validated_data
+                        transaction_data=validated_data,
+                        session=session
                     )
                     
                     show_success_message(
@@ -216,7 +277,7 @@ def show_simple_refill_page(user, permissions):
 
 def show_simple_reports_page(user, permissions):
     """Simple reports page"""
-    from hydrohub.reports import get_profit_loss_report, export_transactions_csv
+    from hydrohub.reports import export_transactions_csv
     from hydrohub.ui_components import show_date_range_picker
     from hydrohub.utils import format_money
     
@@ -227,7 +288,7 @@ def show_simple_reports_page(user, permissions):
     
     if st.button("Generate P&L Report"):
         try:
-            report = get_profit_loss_report(start_date, end_date)
+            report = _cached_profit_loss_report(start_date, end_date)
             
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -257,6 +318,32 @@ def show_simple_reports_page(user, permissions):
         except Exception as e:
             show_error_message("Export failed", str(e))
 
+# Page name -> (required permission, page loader, access denied message)
+PAGES = {
+    "Dashboard": (None, lambda: show_dashboard, None),
+    "Record Refill": (
+        Perm.RECORD_TRANSACTIONS, lambda: show_simple_refill_page,
+        "You don't have permission to record transactions"),
+    "Inventory": (
+        Perm.MANAGE_INVENTORY, functools.partial(_load_page, 'pages.inventory', 'show_inventory_page'),
+        "You don't have permission to manage inventory"),
+    "Expenses": (
+        Perm.MANAGE_EXPENSES, functools.partial(_load_page, 'pages.expenses', 'show_expenses_page'),
+        "You don't have permission to manage expenses"),
+    "Reports": (
+        Perm.VIEW_REPORTS, lambda: show_simple_reports_page,
+        "You don't have permission to view reports"),
+    "Staff Management": (
+        Perm.MANAGE_USERS, functools.partial(_load_page, 'pages.staff', 'show_staff_page'),
+        "You don't have permission to manage staff"),
+    "Ledger": (
+        Perm.VIEW_LEDGER, functools.partial(_load_page, 'pages.ledger', 'show_ledger_page'),
+        "You don't have permission to view ledger"),
+    "Settings": (
+        Perm.MANAGE_SETTINGS, functools.partial(_load_page, 'pages.settings', 'show_settings_page'),
+        "You don't have permission to manage settings"),
+}
+
 def main():
     """Main application logic"""
     # Check if user is logged in and session is valid
@@ -276,55 +363,13 @@ def main():
     page = show_navigation_menu(user['role'])
     
     # Main content area
-    if page == "Dashboard":
-        show_dashboard(user, permissions)
-    
-    elif page == "Record Refill":
-        if permissions['can_record_transactions']:
-            show_simple_refill_page(user, permissions)
-        else:
-            show_error_message("Access denied", "You don't have permission to record transactions")
-    
-    elif page == "Inventory":
-        if permissions['can_manage_inventory']:
-            from pages.inventory import show_inventory_page
-            show_inventory_page(user, permissions)
-        else:
-            show_error_message("Access denied", "You don't have permission to manage inventory")
-    
-    elif page == "Expenses":
-        if permissions['can_manage_expenses']:
-            from pages.expenses import show_expenses_page
-            show_expenses_page(user, permissions)
-        else:
-            show_error_message("Access denied", "You don't have permission to manage expenses")
-    
-    elif page == "Reports":
-        if permissions['can_view_reports']:
-            show_simple_reports_page(user, permissions)
-        else:
-            show_error_message("Access denied", "You don't have permission to view reports")
-    
-    elif page == "Staff Management":
-        if permissions['can_manage_users']:
-            from pages.staff import show_staff_page
-            show_staff_page(user, permissions)
-        else:
-            show_error_message("Access denied", "You don't have permission to manage staff")
-    
-    elif page == "Ledger":
-        if permissions['can_view_ledger']:
-            from pages.ledger import show_ledger_page
-            show_ledger_page(user, permissions)
-        else:
-            show_error_message("Access denied", "You don't have permission to view ledger")
-    
-    elif page == "Settings":
-        if permissions['can_manage_settings']:
-            from pages.settings import show_settings_page
-            show_settings_page(user, permissions)
-        else:
-            show_error_message("Access denied", "You don't have permission to manage settings")
+    required_perm, loader, denied_message = PAGES.get(page, (None, None, None))
+    if loader is None:
+        return
+    if required_perm and not permissions & required_perm:
+        show_error_message("Access denied", denied_message)
+        return
+    loader()(user, permissions)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,12 @@
+"""
+Point the test run at a throwaway database and receipts directory
+"""
+
+import os
+import tempfile
+
+# Set before any hydrohub module is imported; the engine reads it once
+_test_dir = tempfile.mkdtemp(prefix='hydrohub-test-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_test_dir, 'hydrohub.db')}"
+os.environ['RECEIPTS_DIR'] = os.path.join(_test_dir, 'receipts')
+os.environ['BCRYPT_ROUNDS'] = '4'
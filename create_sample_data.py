@@ -9,6 +9,9 @@ from hydrohub.db import get_session
 from hydrohub.models import User, RefillTransaction, Expense
 from hydrohub.auth import create_user
 
+# Demo accounts only need the minimum bcrypt cost
+SAMPLE_BCRYPT_ROUNDS = 4
+
 def create_sample_data():
     """Create sample data for demonstration"""
     print("Creating sample data...")
@@ -17,75 +20,85 @@ def create_sample_data():
     try:
         # Create sample staff users
         try:
-            staff1 = create_user("juan_staff", "staff123", "staff")
+            staff1 = create_user("juan_staff", "staff123", "staff", rounds=SAMPLE_BCRYPT_ROUNDS)
             print(f"✅ Created user: {staff1.username}")
         except:
             print("⚠️ User juan_staff already exists")
         
         try:
-            staff2 = create_user("maria_staff", "staff123", "staff")
+            staff2 = create_user("maria_staff", "staff123", "staff", rounds=SAMPLE_BCRYPT_ROUNDS)
             print(f"✅ Created user: {staff2.username}")
         except:
             print("⚠️ User maria_staff already exists")
         
-        # Get all staff for transactions
-        staff_users = session.query(User).filter(User.role.in_(['admin', 'staff'])).all()
-        
-        if not staff_users:
-            print("❌ No staff users found")
-            return
-        
-        # Create sample transactions
-        customers = ["Juan Cruz", "Maria Santos", "Pedro Garcia", "Ana Lopez", "Carlos Silva"]
-        
-        transactions_created = 0
-        for i in range(20):  # Create 20 transactions
-            days_ago = random.randint(0, 7)  # Last 7 days
-            transaction_time = datetime.now() - timedelta(days=days_ago, hours=random.randint(0, 10))
+        # Insert everything in one transaction with bulk saves
+        with session.begin():
+            # Get all staff for transactions
+            staff_users = session.query(User).filter(User.role.in_(['admin', 'staff'])).all()
             
-            transaction = RefillTransaction(
-                customer_name=random.choice(customers + [None, None]),  # Some walk-ins
-                gallons_count=random.randint(1, 5),
-                price_per_gallon=25.0,
-                total_amount=random.randint(1, 5) * 25.0,
-                payment_type=random.choice(["Cash", "GCash", "Cash", "Cash"]),
-                staff_id=random.choice(staff_users).id,
-                created_at=transaction_time
-            )
+            if not staff_users:
+                print("❌ No staff users found")
+                return
             
-            session.add(transaction)
-            transactions_created += 1
-        
-        # Create sample expenses - Water refill station specific
-        expenses_created = 0
-        water_station_expenses = [
-            {"category": "Water Supply", "amounts": [200, 250, 300], "vendors": ["Cantilan Water District", "Local Water Supplier"]},
-            {"category": "Filters", "amounts": [150, 180, 220], "vendors": ["Filter Supply Co.", "Aqua Parts Store"]},
-            {"category": "Containers", "amounts": [100, 120, 150], "vendors": ["Container Supplier", "Plastic Depot"]},
-            {"category": "Equipment Maintenance", "amounts": [300, 400, 500], "vendors": ["Equipment Service", "Repair Shop"]},
-            {"category": "Transportation", "amounts": [50, 80, 100], "vendors": ["Delivery Service", "Tricycle Fare"]},
-            {"category": "Supplies", "amounts": [30, 50, 75], "vendors": ["Local Store", "Office Supplies"]}
-        ]
-        
-        for i in range(8):  # Create 8 water station specific expenses
-            days_ago = random.randint(0, 14)  # Last 14 days
-            expense_time = datetime.now() - timedelta(days=days_ago, hours=random.randint(0, 10))
+            # Create sample transactions
+            customers = ["Juan Cruz", "Maria Santos", "Pedro Garcia", "Ana Lopez", "Carlos Silva"]
+            
+            # Draw every random column up front instead of per row
+            n = 20  # Create 20 transactions
+            now = datetime.now()
+            days_ago = random.choices(range(8), k=n)  # Last 7 days
+            hours_ago = random.choices(range(11), k=n)
+            customer_names = random.choices(customers + [None, None], k=n)  # Some walk-ins
+            gallons = random.choices(range(1, 6), k=n)
+            payment_types = random.choices(["Cash", "GCash", "Cash", "Cash"], k=n)
+            staff_ids = random.choices([u.id for u in staff_users], k=n)
+            
+            transactions = [
+                RefillTransaction(
+                    customer_name=customer_names[i],
+                    gallons_count=gallons[i],
+                    price_per_gallon=25.0,
+                    total_amount=gallons[i] * 25.0,
+                    payment_type=payment_types[i],
+                    staff_id=staff_ids[i],
+                    created_at=now - timedelta(days=days_ago[i], hours=hours_ago[i])
+                )
+                for i in range(n)
+            ]
+            
+            # Create sample expenses - Water refill station specific
+            water_station_expenses = [
+                {"category": "Water Supply", "amounts": [200, 250, 300], "vendors": ["Cantilan Water District", "Local Water Supplier"]},
+                {"category": "Filters", "amounts": [150, 180, 220], "vendors": ["Filter Supply Co.", "Aqua Parts Store"]},
+                {"category": "Containers", "amounts": [100, 120, 150], "vendors": ["Container Supplier", "Plastic Depot"]},
+                {"category": "Equipment Maintenance", "amounts": [300, 400, 500], "vendors": ["Equipment Service", "Repair Shop"]},
+                {"category": "Transportation", "amounts": [50, 80, 100], "vendors": ["Delivery Service", "Tricycle Fare"]},
+                {"category": "Supplies", "amounts": [30, 50, 75], "vendors": ["Local Store", "Office Supplies"]}
+            ]
             
-            expense_type = random.choice(water_station_expenses)
+            n = 8  # Create 8 water station specific expenses
+            days_ago = random.choices(range(15), k=n)  # Last 14 days
+            hours_ago = random.choices(range(11), k=n)
+            expense_types = random.choices(water_station_expenses, k=n)
+            staff_ids = random.choices([u.id for u in staff_users], k=n)
             
-            expense = Expense(
-                category=expense_type["category"],
-                amount=random.choice(expense_type["amounts"]),
-                vendor=random.choice(expense_type["vendors"]),
-                note=f"Water station {expense_type['category'].lower()} expense",
-                staff_id=random.choice(staff_users).id,
-                created_at=expense_time
-            )
+            expenses = [
+                Expense(
+                    category=expense_type["category"],
+                    amount=random.choice(expense_type["amounts"]),
+                    vendor=random.choice(expense_type["vendors"]),
+                    note=f"Water station {expense_type['category'].lower()} expense",
+                    staff_id=staff_ids[i],
+                    created_at=now - timedelta(days=days_ago[i], hours=hours_ago[i])
+                )
+                for i, expense_type in enumerate(expense_types)
+            ]
             
-            session.add(expense)
-            expenses_created += 1
+            session.bulk_save_objects(transactions)
+            session.bulk_save_objects(expenses)
         
-        session.commit()
+        transactions_created = len(transactions)
+        expenses_created = len(expenses)
         
         print(f"✅ Created {transactions_created} transactions")
         print(f"✅ Created {expenses_created} expenses")
@@ -3,19 +3,25 @@ Authentication system with bcrypt password hashing
 """
 
 import os
-from datetime import datetime, timedelta
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from enum import IntFlag
+from types import MappingProxyType
+from sqlalchemy import select, func
 from sqlalchemy.orm import Session
 from hydrohub.db import get_session
 from hydrohub.models import User
 from hydrohub.utils import get_current_time
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+# Environment settings, read once at import (.env is already loaded by hydrohub.db)
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+_ADMIN_PASSWORD = os.getenv('ADMIN_PASSWORD', 'admin123')
 
 # Password hashing context - Complete bcrypt compatibility fix
 import warnings
-import os
 import sys
 
 # Suppress all bcrypt-related warnings
@@ -32,14 +38,14 @@ import bcrypt as _bcrypt
 class DirectBcryptContext:
     """Direct bcrypt implementation bypassing passlib version issues"""
     
-    def hash(self, password):
+    def hash(self, password, rounds=None):
         """Hash password using bcrypt directly"""
         if isinstance(password, str):
             password = password.encode('utf-8')
         # Ensure password length is within bcrypt limits
         if len(password) > 72:
             password = password[:72]
-        salt = _bcrypt.gensalt()
+        salt = _bcrypt.gensalt(rounds=rounds or BCRYPT_ROUNDS)
         return _bcrypt.hashpw(password, salt).decode('utf-8')
     
     def verify(self, password, hashed):
@@ -51,6 +57,9 @@ class DirectBcryptContext:
         # Ensure password length is within bcrypt limits
         if len(password) > 72:
             password = password[:72]
+        # Malformed or empty hashes can never match, skip the bcrypt work
+        if not hashed.startswith(b'$2'):
+            return False
         try:
             return _bcrypt.checkpw(password, hashed)
         except Exception:
@@ -62,23 +71,79 @@ pwd_context = DirectBcryptContext()
 # Session timeout (hours)
 SESSION_TIMEOUT_HOURS = 8
 
-def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
+# Minimum gap between last_login writes (minutes)
+LAST_LOGIN_UPDATE_MINUTES = 5
+
+class Perm(IntFlag):
+    """Permission bits granted to a role"""
+    MANAGE_USERS = 1
+    VIEW_LEDGER = 2
+    EXPORT_DATA = 4
+    MANAGE_INVENTORY = 8
+    RECORD_TRANSACTIONS = 16
+    MANAGE_EXPENSES = 32
+    VIEW_REPORTS = 64
+    MANAGE_SETTINGS = 128
+
+# Role permissions (read-only, shared by every caller)
+_ROLE_PERMS = MappingProxyType({
+    'admin': (
+        Perm.MANAGE_USERS | Perm.VIEW_LEDGER | Perm.EXPORT_DATA | Perm.MANAGE_INVENTORY |
+        Perm.RECORD_TRANSACTIONS | Perm.MANAGE_EXPENSES | Perm.VIEW_REPORTS | Perm.MANAGE_SETTINGS
+    ),
+    'staff': Perm.MANAGE_INVENTORY | Perm.RECORD_TRANSACTIONS | Perm.MANAGE_EXPENSES | Perm.VIEW_REPORTS,
+    'public': Perm.VIEW_REPORTS
+})
+
+# Successful bcrypt verifications, keyed by (sha256(password), password_hash).
+# Process-local on purpose so hashes never leave this worker.
+_VERIFY_CACHE_SIZE = 256
+_verify_cache = OrderedDict()
+_verify_cache_lock = threading.Lock()
+
+def _clear_verify_cache():
+    """Drop all cached password verifications"""
+    with _verify_cache_lock:
+        _verify_cache.clear()
+
+def hash_password(password: str, rounds: int = None) -> str:
+    """Hash a password using bcrypt (rounds defaults to BCRYPT_ROUNDS)"""
     # Ensure password is not too long for bcrypt (72 bytes max)
     if len(password.encode('utf-8')) > 72:
         password = password[:72]
-    return pwd_context.hash(password)
+    return pwd_context.hash(password, rounds=rounds)
+
+# Hash checked for unknown usernames so they cost as much as real ones.
+# Built at import with hash_password's default rounds (the cost of stored
+# user hashes) so the first unknown login is not slower than the rest.
+_DUMMY_HASH = hash_password('hydrohub-dummy-password')
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    key = (hashlib.sha256(plain_password.encode('utf-8')).digest(), hashed_password)
+    with _verify_cache_lock:
+        if key in _verify_cache:
+            _verify_cache.move_to_end(key)
+            return True
+    
+    if not pwd_context.verify(plain_password, hashed_password):
+        return False
+    
+    # Only successes are cached so failed guesses cannot evict real users
+    with _verify_cache_lock:
+        _verify_cache[key] = True
+        if len(_verify_cache) > _VERIFY_CACHE_SIZE:
+            _verify_cache.popitem(last=False)
+    return True
 
-def create_user(username: str, password: str, role: str = 'staff') -> User:
+def create_user(username: str, password: str, role: str = 'staff', rounds: int = None) -> User:
     """Create a new user"""
     session = get_session()
     try:
         # Check if user already exists
-        existing_user = session.query(User).filter(User.username == username).first()
+        existing_user = session.execute(
+            select(User.id).where(User.username == username)
+        ).scalar_one_or_none()
         if existing_user:
             raise ValueError(f"User '{username}' already exists")
         
@@ -87,7 +152,7 @@ def create_user(username: str, password: str, role: str = 'staff') -> User:
             raise ValueError(f"Invalid role: {role}")
         
         # Create new user
-        hashed_password = hash_password(password)
+        hashed_password = hash_password(password, rounds=rounds)
         user = User(
             username=username,
             password_hash=hashed_password,
@@ -97,7 +162,6 @@ def create_user(username: str, password: str, role: str = 'staff') -> User:
         
         session.add(user)
         session.commit()
-        session.refresh(user)
         
         return user
         
@@ -111,18 +175,32 @@ def authenticate_user(username: str, password: str) -> User:
     """Authenticate a user with username and password"""
     session = get_session()
     try:
-        user = session.query(User).filter(User.username == username).first()
+        user = session.execute(
+            select(User).where(User.username == username)
+        ).scalar_one_or_none()
         
         if not user:
+            # Keep response time in line with a wrong password for a real
+            # user so usernames cannot be probed by timing
+            pwd_context.verify(password, _DUMMY_HASH)
             return None
         
-        if not verify_password(password, user.password_hash):
+        # Return the connection to the pool while bcrypt runs so concurrent
+        # logins do not hold connections during the CPU-bound check
+        password_hash = user.password_hash
+        session.commit()
+        
+        if not verify_password(password, password_hash):
             return None
         
-        # Update last login
-        user.last_login = get_current_time()
-        session.commit()
-        session.refresh(user)
+        # Update last login, skipping the write if it was recorded recently
+        now = get_current_time()
+        last_login = user.last_login
+        if last_login and last_login.tzinfo is None:
+            last_login = last_login.replace(tzinfo=now.tzinfo)
+        if not last_login or now - last_login > timedelta(minutes=LAST_LOGIN_UPDATE_MINUTES):
+            user.last_login = now
+            session.commit()
         
         return user
         
@@ -136,7 +214,7 @@ def get_user_by_id(user_id: int) -> User:
     """Get user by ID"""
     session = get_session()
     try:
-        return session.query(User).filter(User.id == user_id).first()
+        return session.get(User, user_id)
     finally:
         session.close()
 
@@ -144,7 +222,7 @@ def get_all_users() -> list:
     """Get all users (admin only)"""
     session = get_session()
     try:
-        return session.query(User).all()
+        return session.execute(select(User)).scalars().all()
     finally:
         session.close()
 
@@ -152,12 +230,13 @@ def update_user_password(user_id: int, new_password: str) -> bool:
     """Update user password"""
     session = get_session()
     try:
-        user = session.query(User).filter(User.id == user_id).first()
+        user = session.get(User, user_id)
         if not user:
             return False
         
         user.password_hash = hash_password(new_password)
         session.commit()
+        _clear_verify_cache()
         return True
         
     except Exception as e:
@@ -170,13 +249,15 @@ def delete_user(user_id: int) -> bool:
     """Delete a user (admin only)"""
     session = get_session()
     try:
-        user = session.query(User).filter(User.id == user_id).first()
+        user = session.get(User, user_id)
         if not user:
             return False
         
         # Don't delete the last admin
         if user.role == 'admin':
-            admin_count = session.query(User).filter(User.role == 'admin').count()
+            admin_count = session.execute(
+                select(func.count()).select_from(User).where(User.role == 'admin')
+            ).scalar()
             if admin_count <= 1:
                 raise ValueError("Cannot delete the last admin user")
         
@@ -195,12 +276,14 @@ def create_default_admin():
     session = get_session()
     try:
         # Check if any admin exists
-        admin_exists = session.query(User).filter(User.role == 'admin').first()
+        admin_exists = session.execute(
+            select(User.id).where(User.role == 'admin').limit(1)
+        ).first()
         if admin_exists:
             return
         
         # Create default admin
-        admin_password = os.getenv('ADMIN_PASSWORD', 'admin123')
+        admin_password = _ADMIN_PASSWORD
         admin = User(
             username='admin',
             password_hash=hash_password(admin_password),
@@ -220,56 +303,16 @@ def create_default_admin():
     finally:
         session.close()
 
-def is_session_valid(login_time: datetime) -> bool:
-    """Check if session is still valid"""
+def is_session_valid(login_time: float) -> bool:
+    """Check if session is still valid (login_time is a time.time() epoch)"""
     if not login_time:
         return False
-    
-    current_time = get_current_time()
-    # Handle timezone-naive datetime
-    if login_time.tzinfo is None:
-        login_time = login_time.replace(tzinfo=current_time.tzinfo)
-    
-    time_diff = current_time - login_time
-    return time_diff < timedelta(hours=SESSION_TIMEOUT_HOURS)
+    return time.time() - login_time < SESSION_TIMEOUT_HOURS * 3600
 
 def require_role(user_role: str, required_roles: list) -> bool:
     """Check if user has required role"""
     return user_role in required_roles
 
-def get_user_permissions(role: str) -> dict:
-    """Get user permissions based on role"""
-    permissions = {
-        'admin': {
-            'can_manage_users': True,
-            'can_view_ledger': True,
-            'can_export_data': True,
-            'can_manage_inventory': True,
-            'can_record_transactions': True,
-            'can_manage_expenses': True,
-            'can_view_reports': True,
-            'can_manage_settings': True
-        },
-        'staff': {
-            'can_manage_users': False,
-            'can_view_ledger': False,
-            'can_export_data': False,
-            'can_manage_inventory': True,
-            'can_record_transactions': True,
-            'can_manage_expenses': True,
-            'can_view_reports': True,
-            'can_manage_settings': False
-        },
-        'public': {
-            'can_manage_users': False,
-            'can_view_ledger': False,
-            'can_export_data': False,
-            'can_manage_inventory': False,
-            'can_record_transactions': False,
-            'can_manage_expenses': False,
-            'can_view_reports': True,
-            'can_manage_settings': False
-        }
-    }
-    
-    return permissions.get(role, permissions['public'])
+def get_user_permissions(role: str) -> Perm:
+    """Get user permissions based on role (test with ``permissions & Perm.X``)"""
+    return _ROLE_PERMS.get(role, _ROLE_PERMS['public'])
@@ -3,7 +3,7 @@ Database configuration and session management
 """
 
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, insert, select, func, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
@@ -14,15 +14,49 @@ load_dotenv()
 # Database configuration
 DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///hydrohub.db')
 
+# Connection pool sizing; Streamlit reruns check out short-lived
+# connections in bursts, so keep a small warm pool and skip pre-ping.
+# In-memory SQLite ('sqlite://' or ':memory:') uses SingletonThreadPool,
+# which takes no size arguments
+_url = make_url(DATABASE_URL)
+pool_args = {}
+if not (_url.get_backend_name() == 'sqlite' and _url.database in (None, '', ':memory:')):
+    pool_args = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', '5')),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '10')),
+        'pool_pre_ping': False,
+    }
+
 # Create engine
 engine = create_engine(
     DATABASE_URL,
     echo=False,  # Set to True for SQL debugging
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith('sqlite') else {}
+    connect_args={"check_same_thread": False} if DATABASE_URL.startswith('sqlite') else {},
+    **pool_args
+)
+
+# SQLite tuning: WAL lets readers run alongside writers and NORMAL sync
+# drops the per-commit fsync (still durable in WAL mode)
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
 )
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+if DATABASE_URL.startswith('sqlite'):
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragma(dbapi_connection, connection_record):
+        """Apply SQLite pragmas to every new connection"""
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
+# Create session factory; objects stay readable after commit without a
+# re-SELECT since sessions here are short-lived and closed right after
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 # Base class for models
 Base = declarative_base()
@@ -44,63 +78,69 @@ def init_db():
     # Create all tables
     Base.metadata.create_all(bind=engine)
     
+    # create_all skips tables that already exist, so add any missing indexes
+    ensure_indexes()
+    
     # Create default admin user
     create_default_admin()
     
     # Create default inventory items
     create_default_inventory()
 
+def ensure_indexes():
+    """Create model indexes missing from an existing database (e.g. ix_users_username)"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
 def create_default_inventory():
     """Create default inventory items"""
     session = get_session()
     try:
         from hydrohub.models import InventoryItem
         
-        # Check if inventory already exists
-        existing = session.query(InventoryItem).first()
-        if existing:
-            return
-        
-        # Create default inventory items
-        default_items = [
-            {
-                'name': 'Full Gallons',
-                'category': 'Water',
-                'quantity': 100,
-                'unit_cost': 20.00,
-                'location': 'Main Storage'
-            },
-            {
-                'name': 'Empty Gallons',
-                'category': 'Containers',
-                'quantity': 50,
-                'unit_cost': 0.00,
-                'location': 'Main Storage'
-            },
-            {
-                'name': 'Water Filters',
-                'category': 'Equipment',
-                'quantity': 10,
-                'unit_cost': 150.00,
-                'location': 'Equipment Room'
-            },
-            {
-                'name': 'Bottle Caps',
-                'category': 'Supplies',
-                'quantity': 500,
-                'unit_cost': 0.50,
-                'location': 'Supply Cabinet'
-            }
-        ]
-        
-        for item_data in default_items:
-            item = InventoryItem(**item_data)
-            session.add(item)
-        
-        session.commit()
+        with session.begin():
+            # Check if inventory already exists
+            existing = session.query(InventoryItem).first()
+            if existing:
+                return
+            
+            # Create default inventory items
+            default_items = [
+                {
+                    'name': 'Full Gallons',
+                    'category': 'Water',
+                    'quantity': 100,
+                    'unit_cost': 20.00,
+                    'location': 'Main Storage'
+                },
+                {
+                    'name': 'Empty Gallons',
+                    'category': 'Containers',
+                    'quantity': 50,
+                    'unit_cost': 0.00,
+                    'location': 'Main Storage'
+                },
+                {
+                    'name': 'Water Filters',
+                    'category': 'Equipment',
+                    'quantity': 10,
+                    'unit_cost': 150.00,
+                    'location': 'Equipment Room'
+                },
+                {
+                    'name': 'Bottle Caps',
+                    'category': 'Supplies',
+                    'quantity': 500,
+                    'unit_cost': 0.50,
+                    'location': 'Supply Cabinet'
+                }
+            ]
+            
+            # Single executemany INSERT instead of one ORM insert per item
+            session.execute(insert(InventoryItem), default_items)
         
     except Exception as e:
-        session.rollback()
         print(f"Error creating default inventory: {e}")
     finally:
         session.close()
@@ -111,14 +151,21 @@ def get_db_stats():
     try:
         from hydrohub.models import User, RefillTransaction, InventoryItem, Expense, Ledger
         
-        stats = {
-            'users': session.query(User).count(),
-            'transactions': session.query(RefillTransaction).count(),
-            'inventory_items': session.query(InventoryItem).count(),
-            'expenses': session.query(Expense).count(),
-            'ledger_entries': session.query(Ledger).count()
+        tables = {
+            'users': User,
+            'transactions': RefillTransaction,
+            'inventory_items': InventoryItem,
+            'expenses': Expense,
+            'ledger_entries': Ledger
         }
         
+        # One round trip: SELECT (SELECT COUNT(*) FROM users), ...
+        row = session.execute(select(*[
+            select(func.count()).select_from(model).scalar_subquery()
+            for model in tables.values()
+        ])).one()
+        stats = dict(zip(tables, row))
+        
         return stats
         
     except Exception as e:
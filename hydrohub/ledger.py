@@ -2,35 +2,137 @@
 Immutable ledger system for transaction tracking
 """
 
+import os
 import json
 import hashlib
-from datetime import datetime
-from typing import Dict, Any, List, Optional
+import orjson
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Any, List, NamedTuple, Optional
+from sqlalchemy import insert, select, func, Row
 from sqlalchemy.orm import Session
 from hydrohub.db import get_session
-from hydrohub.models import Ledger
+from hydrohub.models import Ledger, LedgerCheckpoint
 from hydrohub.utils import get_current_time
 
-def get_last_hash() -> str:
-    """Get the hash of the last ledger entry"""
-    session = get_session()
-    try:
-        last_entry = session.query(Ledger).order_by(Ledger.id.desc()).first()
-        return last_entry.data_hash if last_entry else '0' * 64
-    finally:
-        session.close()
+# The chain tail is cached in memory so appends skip the last-entry lookup.
+# Set LEDGER_CACHE_LAST_HASH=false when several processes write the ledger.
+CACHE_LAST_HASH = os.getenv('LEDGER_CACHE_LAST_HASH', 'true').lower() == 'true'
+_last_hash_cache: Optional[str] = None
+_ledger_lock = threading.RLock()
+
+def _invalidate_last_hash():
+    """Force the next get_last_hash() to read from the database"""
+    global _last_hash_cache
+    with _ledger_lock:
+        _last_hash_cache = None
+
+def _utc_timestamp() -> str:
+    """Current UTC time in ISO format with microseconds and a Z suffix"""
+    # timespec keeps the microseconds even when they are zero, so every
+    # timestamp has the same width; isoformat is much cheaper than strftime
+    return datetime.now(timezone.utc).isoformat(timespec='microseconds').replace('+00:00', 'Z')
+
+def get_last_hash(session: Optional[Session] = None) -> str:
+    """Get the hash of the last ledger entry
+    
+    Pass session to read the tail inside that session's transaction
+    instead of opening a new one.
+    """
+    global _last_hash_cache
+    with _ledger_lock:
+        if CACHE_LAST_HASH and _last_hash_cache is not None:
+            return _last_hash_cache
+        
+        owns_session = session is None
+        if owns_session:
+            session = get_session()
+        try:
+            # Primary-key lookup of one column; no ORM row to hydrate
+            last_hash = session.execute(
+                select(Ledger.data_hash).where(Ledger.id == select(func.max(Ledger.id)).scalar_subquery())
+            ).scalar() or '0' * 64
+        finally:
+            if owns_session:
+                session.close()
+        
+        if CACHE_LAST_HASH:
+            _last_hash_cache = last_hash
+        return last_hash
+
+def canonical_json(data: Dict[str, Any]) -> bytes:
+    """Serialize to canonical JSON (sorted keys, compact, UTF-8) for hashing"""
+    return orjson.dumps(data, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+
+def _legacy_canonical_json(data: Dict[str, Any]) -> bytes:
+    """Canonical JSON as produced before orjson (non-ASCII escaped)"""
+    return json.dumps(data, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+def _hash_payload(timestamp: str, prev_hash: str, actor_id: Optional[int], data_text: str) -> bytes:
+    """Build the bytes that are hashed for a ledger entry"""
+    return f"{timestamp}|{prev_hash}|{actor_id or ''}|{data_text}".encode('utf-8')
 
 def create_data_hash(timestamp: str, prev_hash: str, actor_id: Optional[int], data_text: str) -> str:
     """Create hash for ledger entry"""
-    payload = f"{timestamp}|{prev_hash}|{actor_id or ''}|{data_text}"
-    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    return hashlib.sha256(_hash_payload(timestamp, prev_hash, actor_id, data_text)).hexdigest()
 
-def add_ledger_entry(
+class LedgerEntryRef(NamedTuple):
+    """Handle to an appended ledger entry"""
+    id: int
+    data_hash: str
+
+
+def _build_ledger_row(
+    prev_hash: str,
     actor_id: Optional[int],
     action_type: str,
     data_dict: Dict[str, Any],
     human_message: str = ""
-) -> str:
+) -> Dict[str, Any]:
+    """Column values for a new ledger entry chained onto prev_hash"""
+    # Create timestamp in ISO format with timezone
+    timestamp = _utc_timestamp()
+    
+    # Create data structure; the message is optional since the log_*
+    # helpers leave it to format_ledger_message() at display time
+    ledger_data = {
+        'action_type': action_type,
+        'payload': data_dict,
+        'timestamp': timestamp
+    }
+    if human_message:
+        ledger_data['human_message'] = human_message
+    
+    # Convert to JSON string
+    data_text = canonical_json(ledger_data).decode('utf-8')
+    
+    return {
+        'timestamp': timestamp,
+        'prev_hash': prev_hash,
+        'data_hash': create_data_hash(timestamp, prev_hash, actor_id, data_text),
+        'actor_id': actor_id,
+        'action_type': action_type,
+        'data_text': data_text
+    }
+
+def _begin_append(session: Session):
+    """Open the append transaction, taking SQLite's write lock up front
+    
+    pysqlite runs SELECTs outside any transaction, so the tail read would
+    otherwise not share the INSERT's; BEGIN IMMEDIATE also makes another
+    process appending at the same time wait instead of reading the same tail.
+    """
+    connection = session.connection()
+    if connection.dialect.name == 'sqlite' and not connection.connection.dbapi_connection.in_transaction:
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+def add_ledger_entry(
+    actor_id: Optional[int],
+    action_type: str,
+    data_dict: Dict[str, Any],
+    human_message: str = "",
+    session: Optional[Session] = None
+) -> LedgerEntryRef:
     """
     Add an entry to the immutable ledger
     
@@ -39,72 +141,164 @@ def add_ledger_entry(
         action_type: Type of action (e.g., 'refill', 'expense', 'inventory_adjust')
         data_dict: Dictionary containing action data
         human_message: Human-readable description of the action
+        session: Reuse the caller's session instead of opening a new one.
+            Commit the caller's own changes first: on SQLite a pending write
+            would hold the database lock while this waits on the ledger lock.
     
     Returns:
-        The hash of the created ledger entry
+        The id and hash of the created ledger entry
     """
-    session = get_session()
+    return add_ledger_entries([{
+        'actor_id': actor_id,
+        'action_type': action_type,
+        'data_dict': data_dict,
+        'human_message': human_message
+    }], session=session)[0]
+
+def add_ledger_entries(
+    entries: List[Dict[str, Any]],
+    session: Optional[Session] = None
+) -> List[LedgerEntryRef]:
+    """
+    Add several entries to the immutable ledger in one INSERT round trip
+    
+    Args:
+        entries: Dicts of add_ledger_entry arguments (actor_id, action_type,
+            data_dict and optionally human_message), chained in list order
+        session: Reuse the caller's session, as for add_ledger_entry
+    
+    Returns:
+        The id and hash of each created entry, in the same order
+    """
+    global _last_hash_cache
+    if not entries:
+        return []
+    
+    # Hold the lock from reading the tail to committing so appends from
+    # concurrent reruns cannot both chain onto the same prev_hash
+    with _ledger_lock:
+        owns_session = session is None
+        if owns_session:
+            session = get_session()
+        try:
+            # Chain each entry onto the one before it, starting at the tail,
+            # which is read in the same transaction as the INSERT
+            _begin_append(session)
+            prev_hash = get_last_hash(session)
+            rows = []
+            for entry in entries:
+                row = _build_ledger_row(prev_hash, **entry)
+                rows.append(row)
+                prev_hash = row['data_hash']
+            
+            # Append with a Core INSERT on the table; the ledger is
+            # write-once so the ORM unit of work and identity map add
+            # nothing here, and the ORM bulk path would split the batch
+            # wherever actor_id is None. RETURNING hands back the new ids
+            # without a follow-up query; rows come back unordered (an
+            # ordered RETURNING is sent one row per statement on SQLite),
+            # so ids are matched up by the unique hash
+            ledger_table = Ledger.__table__
+            result = session.execute(
+                insert(ledger_table).returning(ledger_table.c.id, ledger_table.c.data_hash),
+                rows
+            ).all()
+            session.commit()
+            
+            if CACHE_LAST_HASH:
+                _last_hash_cache = prev_hash
+            ids = {data_hash: entry_id for entry_id, data_hash in result}
+            return [LedgerEntryRef(ids[row['data_hash']], row['data_hash']) for row in rows]
+            
+        except Exception as e:
+            session.rollback()
+            _invalidate_last_hash()
+            raise e
+        finally:
+            if owns_session:
+                session.close()
+
+def _save_checkpoint(session: Session, last_entry: Row):
+    """Record the last entry of a clean verification run"""
     try:
-        # Get previous hash
-        prev_hash = get_last_hash()
-        
-        # Create timestamp in ISO format with timezone
-        timestamp = datetime.utcnow().isoformat() + 'Z'
-        
-        # Create data structure
-        ledger_data = {
-            'action_type': action_type,
-            'payload': data_dict,
-            'human_message': human_message,
-            'timestamp': timestamp
-        }
-        
-        # Convert to JSON string
-        data_text = json.dumps(ledger_data, sort_keys=True, separators=(',', ':'))
-        
-        # Create hash
-        data_hash = create_data_hash(timestamp, prev_hash, actor_id, data_text)
-        
-        # Create ledger entry
-        ledger_entry = Ledger(
-            timestamp=timestamp,
-            prev_hash=prev_hash,
-            data_hash=data_hash,
-            actor_id=actor_id,
-            action_type=action_type,
-            data_text=data_text
-        )
-        
-        session.add(ledger_entry)
+        checkpoint = session.get(LedgerCheckpoint, 1)
+        if checkpoint is None:
+            checkpoint = LedgerCheckpoint(id=1)
+            session.add(checkpoint)
+        checkpoint.last_verified_id = last_entry.id
+        checkpoint.last_verified_hash = last_entry.data_hash
         session.commit()
-        
-        return data_hash
-        
     except Exception as e:
+        # The checkpoint only speeds up later runs, so never fail a verify over it
         session.rollback()
-        raise e
-    finally:
-        session.close()
+        print(f"Error saving ledger checkpoint: {e}")
 
-def verify_ledger() -> List[Dict[str, Any]]:
+def verify_ledger(incremental: bool = False) -> List[Dict[str, Any]]:
     """
     Verify the integrity of the ledger chain
     
+    Args:
+        incremental: Only check entries added since the last clean
+            incremental run, chaining from the saved checkpoint instead of
+            the genesis hash. A clean incremental run moves the checkpoint
+            forward (a write); full runs only read.
+    
     Returns:
         List of inconsistencies found (empty list if ledger is intact)
     """
     session = get_session()
     try:
-        entries = session.query(Ledger).order_by(Ledger.id.asc()).all()
+        # Plain rows of the chained columns; verification never needs
+        # hydrated Ledger objects
+        query = select(
+            Ledger.id,
+            Ledger.timestamp,
+            Ledger.prev_hash,
+            Ledger.data_hash,
+            Ledger.actor_id,
+            Ledger.data_text
+        ).order_by(Ledger.id.asc())
+        expected_prev_hash = '0' * 64
+        
+        # Only incremental runs read the checkpoint, so a full verify works
+        # even before the ledger_checkpoint table exists
+        checkpoint = session.get(LedgerCheckpoint, 1) if incremental else None
+        if checkpoint:
+            query = query.where(Ledger.id > checkpoint.last_verified_id)
+            expected_prev_hash = checkpoint.last_verified_hash
+        
+        entries = session.execute(query).all()
         
         if not entries:
             return []  # Empty ledger is valid
         
+        # Recompute every entry's hash up front, ahead of the chain checks
+        computed_hashes = [
+            hashlib.sha256(_hash_payload(entry.timestamp, entry.prev_hash, entry.actor_id, entry.data_text)).hexdigest()
+            for entry in entries
+        ]
+        
+        # Each entry must link to the stored hash of the one before it
+        expected_prevs = [expected_prev_hash]
+        expected_prevs.extend(entry.data_hash for entry in entries[:-1])
+        
+        # Screen the whole batch in one pass; the writer always emits the
+        # action_type and payload keys, so a substring check clears
+        # well-formed rows without parsing them
+        flagged = [
+            i for i, (entry, computed_hash, expected_prev) in enumerate(zip(entries, computed_hashes, expected_prevs))
+            if computed_hash != entry.data_hash or entry.prev_hash != expected_prev
+            or '"action_type":' not in entry.data_text or '"payload":' not in entry.data_text
+        ]
+        
         inconsistencies = []
-        expected_prev_hash = '0' * 64
         
-        for entry in entries:
-            # Check if prev_hash matches expected
+        # Only flagged entries are revisited to work out what failed
+        for i in flagged:
+            entry = entries[i]
+            computed_hash = computed_hashes[i]
+            expected_prev_hash = expected_prevs[i]
+            
             if entry.prev_hash != expected_prev_hash:
                 inconsistencies.append({
                     'entry_id': entry.id,
@@ -113,14 +307,6 @@ def verify_ledger() -> List[Dict[str, Any]]:
                     'actual': entry.prev_hash
                 })
             
-            # Recompute hash and verify
-            computed_hash = create_data_hash(
-                entry.timestamp,
-                entry.prev_hash,
-                entry.actor_id,
-                entry.data_text
-            )
-            
             if entry.data_hash != computed_hash:
                 inconsistencies.append({
                     'entry_id': entry.id,
@@ -130,23 +316,25 @@ def verify_ledger() -> List[Dict[str, Any]]:
                 })
             
             # Verify JSON structure
-            try:
-                data = json.loads(entry.data_text)
-                if 'action_type' not in data or 'payload' not in data:
+            data_text = entry.data_text
+            if '"action_type":' not in data_text or '"payload":' not in data_text:
+                try:
+                    data = orjson.loads(data_text)
+                    if 'action_type' not in data or 'payload' not in data:
+                        inconsistencies.append({
+                            'entry_id': entry.id,
+                            'error': 'invalid_json_structure',
+                            'data': data_text[:100] + '...' if len(data_text) > 100 else data_text
+                        })
+                except orjson.JSONDecodeError:
                     inconsistencies.append({
                         'entry_id': entry.id,
-                        'error': 'invalid_json_structure',
-                        'data': entry.data_text[:100] + '...' if len(entry.data_text) > 100 else entry.data_text
+                        'error': 'invalid_json',
+                        'data': data_text[:100] + '...' if len(data_text) > 100 else data_text
                     })
-            except json.JSONDecodeError:
-                inconsistencies.append({
-                    'entry_id': entry.id,
-                    'error': 'invalid_json',
-                    'data': entry.data_text[:100] + '...' if len(entry.data_text) > 100 else entry.data_text
-                })
-            
-            # Set expected prev_hash for next iteration
-            expected_prev_hash = entry.data_hash
+        
+        if incremental and not inconsistencies:
+            _save_checkpoint(session, entries[-1])
         
         return inconsistencies
         
@@ -157,38 +345,38 @@ def get_ledger_entries(
     limit: int = 100,
     offset: int = 0,
     action_type: Optional[str] = None,
-    actor_id: Optional[int] = None
-) -> List[Ledger]:
-    """Get ledger entries with optional filtering"""
+    actor_id: Optional[int] = None,
+    before_id: Optional[int] = None
+) -> List[Row]:
+    """
+    Get ledger entries with optional filtering, newest first
+    
+    Pass the smallest id of the previous page as before_id to page with a
+    keyset seek instead of an OFFSET scan.
+    """
     session = get_session()
     try:
-        # Simple query without relationships to avoid session issues
-        query = session.query(Ledger).order_by(Ledger.id.desc())
+        # Select plain columns; the lightweight Row results need no session
+        query = select(
+            Ledger.id,
+            Ledger.timestamp,
+            Ledger.action_type,
+            Ledger.actor_id,
+            Ledger.prev_hash,
+            Ledger.data_hash,
+            Ledger.data_text
+        ).order_by(Ledger.id.desc())
         
         if action_type and action_type != "All":
-            query = query.filter(Ledger.action_type == action_type)
+            query = query.where(Ledger.action_type == action_type)
         
         if actor_id and actor_id > 0:
-            query = query.filter(Ledger.actor_id == actor_id)
-        
-        entries = query.offset(offset).limit(limit).all()
+            query = query.where(Ledger.actor_id == actor_id)
         
-        # Create simple data objects to avoid session dependencies
-        simple_entries = []
-        for entry in entries:
-            # Create a simple object with just the data we need
-            simple_entry = type('SimpleEntry', (), {
-                'id': entry.id,
-                'timestamp': entry.timestamp,
-                'action_type': entry.action_type,
-                'actor_id': entry.actor_id,
-                'prev_hash': entry.prev_hash,
-                'data_hash': entry.data_hash,
-                'data_text': entry.data_text
-            })()
-            simple_entries.append(simple_entry)
+        if before_id is not None:
+            query = query.where(Ledger.id < before_id)
         
-        return simple_entries
+        return session.execute(query.offset(offset).limit(limit)).all()
         
     except Exception as e:
         print(f"Error getting ledger entries: {e}")
@@ -200,12 +388,19 @@ def get_ledger_stats() -> Dict[str, Any]:
     """Get ledger statistics"""
     session = get_session()
     try:
-        total_entries = session.query(Ledger).count()
+        # Count, first/last timestamps and the tail hash in one round trip
+        first_id = select(func.min(Ledger.id)).correlate(None).scalar_subquery()
+        last_id = select(func.max(Ledger.id)).correlate(None).scalar_subquery()
+        total_entries, first_entry_time, last_entry_time, last_hash = session.execute(select(
+            select(func.count()).select_from(Ledger).scalar_subquery(),
+            select(Ledger.timestamp).where(Ledger.id == first_id).scalar_subquery(),
+            select(Ledger.timestamp).where(Ledger.id == last_id).scalar_subquery(),
+            select(Ledger.data_hash).where(Ledger.id == last_id).scalar_subquery()
+        )).one()
         
         # Get action type counts - fixed query
         action_counts = {}
         try:
-            from sqlalchemy import func
             action_type_results = session.query(
                 Ledger.action_type, 
                 func.count(Ledger.action_type)
@@ -217,16 +412,12 @@ def get_ledger_stats() -> Dict[str, Any]:
             print(f"Error getting action counts: {e}")
             action_counts = {}
         
-        # Get first and last entry timestamps
-        first_entry = session.query(Ledger).order_by(Ledger.id.asc()).first()
-        last_entry = session.query(Ledger).order_by(Ledger.id.desc()).first()
-        
         return {
             'total_entries': total_entries,
             'action_counts': action_counts,
-            'first_entry_time': first_entry.timestamp if first_entry else None,
-            'last_entry_time': last_entry.timestamp if last_entry else None,
-            'last_hash': last_entry.data_hash if last_entry else '0' * 64
+            'first_entry_time': first_entry_time,
+            'last_entry_time': last_entry_time,
+            'last_hash': last_hash or '0' * 64
         }
         
     except Exception as e:
@@ -254,91 +445,168 @@ def export_ledger_proof(start_date: Optional[str] = None, end_date: Optional[str
     """
     session = get_session()
     try:
-        query = session.query(Ledger).order_by(Ledger.id.asc())
+        query = select(
+            Ledger.id,
+            Ledger.timestamp,
+            Ledger.prev_hash,
+            Ledger.data_hash,
+            Ledger.actor_id,
+            Ledger.action_type,
+            Ledger.data_text
+        ).order_by(Ledger.id.asc())
         
         if start_date:
-            query = query.filter(Ledger.timestamp >= start_date)
+            query = query.where(Ledger.timestamp >= start_date)
         if end_date:
-            query = query.filter(Ledger.timestamp <= end_date)
+            query = query.where(Ledger.timestamp <= end_date)
+        
+        # The proof hash is fed while rows stream in: with sorted keys,
+        # "entries" is the first member of the canonical proof JSON
+        proof_digest = hashlib.sha256(b'{"entries":[')
+        entries = []
         
-        entries = query.all()
+        for entry in session.execute(query.execution_options(yield_per=1000)):
+            entry_data = entry._asdict()
+            if entries:
+                proof_digest.update(b',')
+            proof_digest.update(canonical_json(entry_data))
+            entries.append(entry_data)
         
         # Create proof structure
         proof = {
-            'export_timestamp': datetime.utcnow().isoformat() + 'Z',
+            'export_timestamp': _utc_timestamp(),
             'filter_start_date': start_date,
             'filter_end_date': end_date,
             'total_entries': len(entries),
-            'entries': [],
+            'entries': entries,
             'verification_info': {
                 'hash_algorithm': 'SHA-256',
-                'payload_format': 'timestamp|prev_hash|actor_id|data_text'
+                'payload_format': 'timestamp|prev_hash|actor_id|data_text',
+                'data_encoding': 'data_text is uncompressed UTF-8 JSON with sorted keys'
             }
         }
         
-        for entry in entries:
-            proof['entries'].append({
-                'id': entry.id,
-                'timestamp': entry.timestamp,
-                'prev_hash': entry.prev_hash,
-                'data_hash': entry.data_hash,
-                'actor_id': entry.actor_id,
-                'action_type': entry.action_type,
-                'data_text': entry.data_text
-            })
-        
-        # Add verification hash of the entire proof
-        proof_json = json.dumps(proof, sort_keys=True, separators=(',', ':'))
-        proof['proof_hash'] = hashlib.sha256(proof_json.encode('utf-8')).hexdigest()
+        # Close the entries array and append the remaining members, which
+        # gives the same digest as hashing canonical_json(proof)
+        remaining = {key: value for key, value in proof.items() if key != 'entries'}
+        proof_digest.update(b'],')
+        proof_digest.update(canonical_json(remaining)[1:])
+        proof['proof_hash'] = proof_digest.hexdigest()
         
         return proof
         
     finally:
         session.close()
 
+def verify_ledger_proof(data: Dict[str, Any]) -> bool:
+    """
+    Check the proof_hash of an exported ledger proof
+    
+    Proofs exported before the switch to orjson escaped non-ASCII text,
+    so both canonical encodings are accepted.
+    """
+    proof = {
+        'export_timestamp': data['export_timestamp'],
+        'filter_start_date': data.get('filter_start_date'),
+        'filter_end_date': data.get('filter_end_date'),
+        'total_entries': data['total_entries'],
+        'entries': data['entries'],
+        'verification_info': data['verification_info']
+    }
+    
+    for encode in (canonical_json, _legacy_canonical_json):
+        if hashlib.sha256(encode(proof)).hexdigest() == data['proof_hash']:
+            return True
+    return False
+
 # Convenience functions for common ledger entries
+# (these store no human_message; format_ledger_message() builds it on display)
 
-def log_user_action(actor_id: int, action: str, details: Dict[str, Any]):
+def log_user_action(actor_id: int, action: str, details: Dict[str, Any], session: Optional[Session] = None):
     """Log a user action"""
     return add_ledger_entry(
         actor_id=actor_id,
         action_type='user_action',
         data_dict={'action': action, 'details': details},
-        human_message=f"User action: {action}"
+        session=session
     )
 
-def log_refill_transaction(actor_id: int, transaction_id: int, transaction_data: Dict[str, Any]):
+def log_refill_transaction(actor_id: int, transaction_id: int, transaction_data: Dict[str, Any], session: Optional[Session] = None):
     """Log a refill transaction"""
     return add_ledger_entry(
         actor_id=actor_id,
         action_type='refill_transaction',
         data_dict={'transaction_id': transaction_id, **transaction_data},
-        human_message=f"Refill transaction #{transaction_id}: {transaction_data.get('gallons_count', 0)} gallons, ₱{transaction_data.get('total_amount', 0):.2f}"
+        session=session
     )
 
-def log_expense(actor_id: int, expense_id: int, expense_data: Dict[str, Any]):
+def log_expense(actor_id: int, expense_id: int, expense_data: Dict[str, Any], session: Optional[Session] = None):
     """Log an expense"""
     return add_ledger_entry(
         actor_id=actor_id,
         action_type='expense',
         data_dict={'expense_id': expense_id, **expense_data},
-        human_message=f"Expense: {expense_data.get('category', 'Unknown')} - ₱{expense_data.get('amount', 0):.2f}"
+        session=session
     )
 
-def log_inventory_change(actor_id: int, item_id: int, change_data: Dict[str, Any]):
+def log_inventory_change(actor_id: int, item_id: int, change_data: Dict[str, Any], session: Optional[Session] = None):
     """Log an inventory change"""
     return add_ledger_entry(
         actor_id=actor_id,
         action_type='inventory_change',
         data_dict={'item_id': item_id, **change_data},
-        human_message=f"Inventory change: {change_data.get('item_name', 'Unknown')} - {change_data.get('change_type', 'Unknown')}"
+        session=session
     )
 
-def log_system_event(event_type: str, event_data: Dict[str, Any]):
+def log_system_event(event_type: str, event_data: Dict[str, Any], session: Optional[Session] = None):
     """Log a system event"""
     return add_ledger_entry(
         actor_id=None,
         action_type='system_event',
         data_dict={'event_type': event_type, **event_data},
-        human_message=f"System event: {event_type}"
+        session=session
     )
+
+# Display templates, one per action type; ids use %s so entries with a
+# missing field still render
+_USER_ACTION_FMT = "User action: %s"
+_REFILL_FMT = "Refill transaction #%s: %s gallons, ₱%.2f"
+_EXPENSE_FMT = "Expense: %s - ₱%.2f"
+_INV_FMT = "Inventory change: %s - %s"
+_SYSTEM_EVENT_FMT = "System event: %s"
+_EXPORT_TRANSACTIONS_FMT = "Exported %s transactions to %s for period %s to %s"
+_EXPORT_EXPENSES_FMT = "Exported %s expenses to %s for period %s to %s"
+_EXPORT_PROFIT_LOSS_FMT = "Exported P&L report to %s for period %s to %s"
+_EXPORT_INVENTORY_FMT = "Exported inventory report to %s (%s items)"
+_EXPORT_LEDGER_FMT = "Exported ledger to %s (%s entries)"
+
+
+def format_ledger_message(data: Dict[str, Any]) -> str:
+    """Human-readable description of a parsed ledger entry"""
+    if data.get('human_message'):
+        return data['human_message']
+    
+    action_type = data.get('action_type')
+    payload = data.get('payload') or {}
+    
+    if action_type == 'user_action':
+        return _USER_ACTION_FMT % (payload.get('action'),)
+    if action_type == 'refill_transaction':
+        return _REFILL_FMT % (payload.get('transaction_id'), payload.get('gallons_count', 0), payload.get('total_amount') or 0)
+    if action_type == 'expense':
+        return _EXPENSE_FMT % (payload.get('category', 'Unknown'), payload.get('amount') or 0)
+    if action_type == 'inventory_change':
+        return _INV_FMT % (payload.get('item_name', 'Unknown'), payload.get('change_type', 'Unknown'))
+    if action_type == 'system_event':
+        return _SYSTEM_EVENT_FMT % (payload.get('event_type'),)
+    if action_type == 'export_transactions':
+        return _EXPORT_TRANSACTIONS_FMT % (payload.get('transaction_count', 0), payload.get('format', 'CSV'), payload.get('start_date'), payload.get('end_date'))
+    if action_type == 'export_expenses':
+        return _EXPORT_EXPENSES_FMT % (payload.get('expense_count', 0), payload.get('format', 'CSV'), payload.get('start_date'), payload.get('end_date'))
+    if action_type == 'export_profit_loss':
+        return _EXPORT_PROFIT_LOSS_FMT % (payload.get('format', 'CSV'), payload.get('start_date'), payload.get('end_date'))
+    if action_type == 'export_inventory':
+        return _EXPORT_INVENTORY_FMT % (payload.get('format', 'CSV'), payload.get('item_count', 0))
+    if action_type == 'export_ledger':
+        return _EXPORT_LEDGER_FMT % (payload.get('format', 'CSV'), payload.get('entry_count', 0))
+    return ""
@@ -2,7 +2,7 @@
 SQLAlchemy database models for HydroHub
 """
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey, CheckConstraint
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey, CheckConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from hydrohub.db import Base
@@ -54,6 +54,8 @@ class RefillTransaction(Base):
         CheckConstraint("total_amount >= 0", name='check_positive_total'),
         CheckConstraint("payment_type IN ('Cash', 'GCash', 'PayMaya', 'Bank Transfer', 'On-account')", 
                        name='check_payment_type'),
+        # Per-staff date-range lookups (staff performance reports)
+        Index('ix_refill_staff_created', 'staff_id', 'created_at'),
     )
     
     def __repr__(self):
@@ -97,6 +99,10 @@ class Expense(Base):
     # Constraints
     __table_args__ = (
         CheckConstraint("amount >= 0", name='check_positive_amount'),
+        # Per-staff date-range lookups (staff performance reports)
+        Index('ix_expense_staff_created', 'staff_id', 'created_at'),
+        # Date-range listings filtered by category (expense pages)
+        Index('ix_expense_created_category', 'created_at', 'category'),
     )
     
     def __repr__(self):
@@ -116,5 +122,22 @@ class Ledger(Base):
     # Relationships
     actor = relationship("User", back_populates="ledger_entries")
     
+    # Filtered, newest-first listings walk these instead of sorting
+    __table_args__ = (
+        Index('ix_ledger_action_id', 'action_type', 'id'),
+        Index('ix_ledger_actor_id_id', 'actor_id', 'id'),
+    )
+    
     def __repr__(self):
         return f"<Ledger(id={self.id}, action_type='{self.action_type}', hash='{self.data_hash[:16]}...')>"
+
+class LedgerCheckpoint(Base):
+    __tablename__ = 'ledger_checkpoint'
+    
+    id = Column(Integer, primary_key=True)  # Single row, id = 1
+    last_verified_id = Column(Integer, nullable=False)
+    last_verified_hash = Column(String(64), nullable=False)
+    verified_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<LedgerCheckpoint(last_verified_id={self.last_verified_id})>"
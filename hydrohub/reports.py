@@ -4,36 +4,87 @@ Reporting and data export functionality
 
 import csv
 import json
-import pandas as pd
-from datetime import datetime, date
-from typing import Dict, Any, List, Optional
+from datetime import datetime, date, timedelta
+from typing import Dict, Any, Iterator, List, Optional
 from io import StringIO, BytesIO
+import pandas as pd
 from sqlalchemy import func, and_
 from hydrohub.db import get_session
 from hydrohub.models import RefillTransaction, Expense, InventoryItem, User, Ledger
 from hydrohub.utils import format_money, get_current_time, get_business_config
 from hydrohub.ledger import add_ledger_entry, export_ledger_proof
 
+# Rows fetched per round trip when streaming records into an export
+EXPORT_BATCH_SIZE = 1000
+
+def _day_bounds(start_date: date, end_date: date):
+    """Half-open datetime bounds covering start_date through end_date
+    
+    Filter with created_at >= start and created_at < end; the exclusive
+    next-midnight bound keeps the range a plain index range scan.
+    """
+    return (
+        datetime.combine(start_date, datetime.min.time()),
+        datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+    )
+
+def _sales_totals(session, start_date: date, end_date: date) -> Dict[str, Any]:
+    """Transaction count, gallons and revenue for a date range"""
+    start_datetime, end_datetime = _day_bounds(start_date, end_date)
+    total_count, total_gallons, total_revenue = session.query(
+        func.count(RefillTransaction.id),
+        func.coalesce(func.sum(RefillTransaction.gallons_count), 0),
+        func.coalesce(func.sum(RefillTransaction.total_amount), 0.0)
+    ).filter(
+        RefillTransaction.created_at >= start_datetime,
+        RefillTransaction.created_at < end_datetime
+    ).one()
+    return {'total_count': total_count, 'total_gallons': total_gallons, 'total_revenue': total_revenue}
+
+def _expense_totals(session, start_date: date, end_date: date) -> Dict[str, Any]:
+    """Expense count and amount for a date range"""
+    start_datetime, end_datetime = _day_bounds(start_date, end_date)
+    total_count, total_amount = session.query(
+        func.count(Expense.id),
+        func.coalesce(func.sum(Expense.amount), 0.0)
+    ).filter(
+        Expense.created_at >= start_datetime,
+        Expense.created_at < end_datetime
+    ).one()
+    return {'total_count': total_count, 'total_amount': total_amount}
+
+def _expense_category_breakdown(session, start_date: date, end_date: date) -> Dict[str, Dict[str, Any]]:
+    """Expense count and amount per category for a date range"""
+    start_datetime, end_datetime = _day_bounds(start_date, end_date)
+    category_breakdown = {}
+    for category, count, amount in session.query(
+        Expense.category,
+        func.count(Expense.id),
+        func.sum(Expense.amount)
+    ).filter(
+        Expense.created_at >= start_datetime,
+        Expense.created_at < end_datetime
+    ).group_by(Expense.category):
+        category_breakdown[category] = {'count': count, 'amount': amount}
+    return category_breakdown
+
 def get_sales_summary(start_date: date, end_date: date) -> Dict[str, Any]:
     """Get sales summary for date range"""
     session = get_session()
     try:
-        # Convert dates to datetime for comparison
-        start_datetime = datetime.combine(start_date, datetime.min.time())
-        end_datetime = datetime.combine(end_date, datetime.max.time())
+        # Totals are aggregated in SQL rather than over loaded rows
+        totals = _sales_totals(session, start_date, end_date)
+        total_transactions = totals['total_count']
+        total_gallons = totals['total_gallons']
+        total_revenue = totals['total_revenue']
         
-        # Get transactions in date range
-        transactions = session.query(RefillTransaction).filter(
-            and_(
-                RefillTransaction.created_at >= start_datetime,
-                RefillTransaction.created_at <= end_datetime
-            )
-        ).all()
+        # Convert dates to datetime for comparison
+        start_datetime, end_datetime = _day_bounds(start_date, end_date)
         
-        # Calculate summary
-        total_transactions = len(transactions)
-        total_gallons = sum(t.gallons_count for t in transactions)
-        total_revenue = sum(t.total_amount for t in transactions)
+        in_range = and_(
+            RefillTransaction.created_at >= start_datetime,
+            RefillTransaction.created_at < end_datetime
+        )
         
         # Average calculations
         avg_gallons_per_transaction = total_gallons / total_transactions if total_transactions > 0 else 0
@@ -42,12 +93,12 @@ def get_sales_summary(start_date: date, end_date: date) -> Dict[str, Any]:
         
         # Payment method breakdown
         payment_breakdown = {}
-        for transaction in transactions:
-            payment_type = transaction.payment_type
-            if payment_type not in payment_breakdown:
-                payment_breakdown[payment_type] = {'count': 0, 'amount': 0}
-            payment_breakdown[payment_type]['count'] += 1
-            payment_breakdown[payment_type]['amount'] += transaction.total_amount
+        for payment_type, count, amount in session.query(
+            RefillTransaction.payment_type,
+            func.count(RefillTransaction.id),
+            func.sum(RefillTransaction.total_amount)
+        ).filter(in_range).group_by(RefillTransaction.payment_type):
+            payment_breakdown[payment_type] = {'count': count, 'amount': amount}
         
         return {
             'period': {
@@ -63,41 +114,55 @@ def get_sales_summary(start_date: date, end_date: date) -> Dict[str, Any]:
                 'avg_revenue_per_transaction': avg_revenue_per_transaction,
                 'avg_price_per_gallon': avg_price_per_gallon
             },
-            'payment_breakdown': payment_breakdown,
-            'raw_transactions': transactions
+            'payment_breakdown': payment_breakdown
         }
         
     finally:
         session.close()
 
-def get_expense_summary(start_date: date, end_date: date) -> Dict[str, Any]:
-    """Get expense summary for date range"""
+def iter_transaction_frames(start_date: date, end_date: date) -> Iterator[pd.DataFrame]:
+    """Stream the individual transactions in a date range as DataFrames
+    
+    Frames carry the exported columns plus the staff username, joined in
+    the same query, EXPORT_BATCH_SIZE rows at a time. The session stays
+    open until the generator is exhausted or closed.
+    """
     session = get_session()
     try:
-        # Convert dates to datetime for comparison
-        start_datetime = datetime.combine(start_date, datetime.min.time())
-        end_datetime = datetime.combine(end_date, datetime.max.time())
+        start_datetime, end_datetime = _day_bounds(start_date, end_date)
         
-        # Get expenses in date range
-        expenses = session.query(Expense).filter(
+        query = session.query(
+            RefillTransaction.id,
+            RefillTransaction.created_at,
+            RefillTransaction.customer_name,
+            RefillTransaction.gallons_count,
+            RefillTransaction.price_per_gallon,
+            RefillTransaction.total_amount,
+            RefillTransaction.payment_type,
+            User.username,
+            RefillTransaction.receipt_path
+        ).outerjoin(User, User.id == RefillTransaction.staff_id).filter(
             and_(
-                Expense.created_at >= start_datetime,
-                Expense.created_at <= end_datetime
+                RefillTransaction.created_at >= start_datetime,
+                RefillTransaction.created_at < end_datetime
             )
-        ).all()
+        )
+        yield from pd.read_sql(query.statement, session.connection(), chunksize=EXPORT_BATCH_SIZE)
         
+    finally:
+        session.close()
+
+def get_expense_summary(start_date: date, end_date: date) -> Dict[str, Any]:
+    """Get expense summary for date range"""
+    session = get_session()
+    try:
         # Calculate summary
-        total_expenses = len(expenses)
-        total_amount = sum(e.amount for e in expenses)
+        totals = _expense_totals(session, start_date, end_date)
+        total_expenses = totals['total_count']
+        total_amount = totals['total_amount']
         
         # Category breakdown
-        category_breakdown = {}
-        for expense in expenses:
-            category = expense.category
-            if category not in category_breakdown:
-                category_breakdown[category] = {'count': 0, 'amount': 0}
-            category_breakdown[category]['count'] += 1
-            category_breakdown[category]['amount'] += expense.amount
+        category_breakdown = _expense_category_breakdown(session, start_date, end_date)
         
         return {
             'period': {
@@ -110,57 +175,99 @@ def get_expense_summary(start_date: date, end_date: date) -> Dict[str, Any]:
                 'total_amount': total_amount,
                 'avg_amount_per_expense': total_amount / total_expenses if total_expenses > 0 else 0
             },
-            'category_breakdown': category_breakdown,
-            'raw_expenses': expenses
+            'category_breakdown': category_breakdown
         }
         
     finally:
         session.close()
 
+def iter_expense_frames(start_date: date, end_date: date) -> Iterator[pd.DataFrame]:
+    """Stream the individual expenses in a date range, with staff usernames, as DataFrames"""
+    session = get_session()
+    try:
+        start_datetime, end_datetime = _day_bounds(start_date, end_date)
+        
+        query = session.query(
+            Expense.id,
+            Expense.created_at,
+            Expense.category,
+            Expense.amount,
+            Expense.vendor,
+            Expense.note,
+            User.username,
+            Expense.receipt_path
+        ).outerjoin(User, User.id == Expense.staff_id).filter(
+            and_(
+                Expense.created_at >= start_datetime,
+                Expense.created_at < end_datetime
+            )
+        )
+        yield from pd.read_sql(query.statement, session.connection(), chunksize=EXPORT_BATCH_SIZE)
+        
+    finally:
+        session.close()
+
 def get_profit_loss_report(start_date: date, end_date: date) -> Dict[str, Any]:
     """Generate profit and loss report"""
-    sales_summary = get_sales_summary(start_date, end_date)
-    expense_summary = get_expense_summary(start_date, end_date)
-    
-    revenue = sales_summary['transactions']['total_revenue']
-    expenses = expense_summary['expenses']['total_amount']
+    session = get_session()
+    try:
+        return _profit_loss_report(session, start_date, end_date)
+    finally:
+        session.close()
+
+def _profit_loss_report(session, start_date: date, end_date: date) -> Dict[str, Any]:
+    """Build the profit and loss report with the caller's session"""
+    # Only the scalar totals are needed, not the per-group breakdowns
+    sales_totals = _sales_totals(session, start_date, end_date)
+    expense_totals = _expense_totals(session, start_date, end_date)
+    
+    revenue = sales_totals['total_revenue']
+    expenses = expense_totals['total_amount']
     gross_profit = revenue - expenses
     
     # Calculate margins
     gross_margin = (gross_profit / revenue * 100) if revenue > 0 else 0
     
     return {
-        'period': sales_summary['period'],
+        'period': {
+            'start_date': start_date,
+            'end_date': end_date,
+            'days': (end_date - start_date).days + 1
+        },
         'revenue': revenue,
         'expenses': expenses,
         'gross_profit': gross_profit,
         'gross_margin_percent': gross_margin,
-        'sales_summary': sales_summary,
-        'expense_summary': expense_summary
+        'sales_totals': sales_totals,
+        'expense_totals': expense_totals
     }
 
 def get_inventory_report() -> Dict[str, Any]:
     """Get current inventory report"""
     session = get_session()
     try:
-        items = session.query(InventoryItem).all()
+        item_value = InventoryItem.quantity * InventoryItem.unit_cost
         
-        total_items = len(items)
-        total_value = sum(item.quantity * item.unit_cost for item in items)
-        
-        # Category breakdown
+        # Category breakdown, one row per category, with the overall
+        # totals accumulated in the same pass
         category_breakdown = {}
-        for item in items:
-            category = item.category
-            if category not in category_breakdown:
-                category_breakdown[category] = {'count': 0, 'quantity': 0, 'value': 0}
-            category_breakdown[category]['count'] += 1
-            category_breakdown[category]['quantity'] += item.quantity
-            category_breakdown[category]['value'] += item.quantity * item.unit_cost
+        total_items = 0
+        total_value = 0
+        for category, count, quantity, value in session.query(
+            InventoryItem.category,
+            func.count(InventoryItem.id),
+            func.sum(InventoryItem.quantity),
+            func.sum(item_value)
+        ).group_by(InventoryItem.category):
+            category_breakdown[category] = {'count': count, 'quantity': quantity, 'value': value}
+            total_items += count
+            total_value += value
         
         # Low stock items (assuming threshold of 10)
         low_stock_threshold = 10
-        low_stock_items = [item for item in items if item.quantity <= low_stock_threshold]
+        low_stock_items = session.query(InventoryItem).filter(
+            InventoryItem.quantity <= low_stock_threshold
+        ).all()
         
         return {
             'summary': {
@@ -169,54 +276,80 @@ def get_inventory_report() -> Dict[str, Any]:
                 'low_stock_count': len(low_stock_items)
             },
             'category_breakdown': category_breakdown,
-            'low_stock_items': low_stock_items,
-            'all_items': items
+            'low_stock_items': low_stock_items
         }
         
     finally:
         session.close()
 
+def iter_inventory_frames() -> Iterator[pd.DataFrame]:
+    """Stream every inventory item as DataFrames, EXPORT_BATCH_SIZE rows at a time"""
+    session = get_session()
+    try:
+        query = session.query(
+            InventoryItem.id,
+            InventoryItem.name,
+            InventoryItem.category,
+            InventoryItem.quantity,
+            InventoryItem.unit_cost,
+            InventoryItem.location,
+            InventoryItem.last_updated
+        )
+        yield from pd.read_sql(query.statement, session.connection(), chunksize=EXPORT_BATCH_SIZE)
+        
+    finally:
+        session.close()
+
 def get_staff_performance_report(start_date: date, end_date: date) -> Dict[str, Any]:
     """Get staff performance report"""
     session = get_session()
     try:
         # Convert dates to datetime for comparison
-        start_datetime = datetime.combine(start_date, datetime.min.time())
-        end_datetime = datetime.combine(end_date, datetime.max.time())
+        start_datetime, end_datetime = _day_bounds(start_date, end_date)
         
-        # Get staff with their transactions
-        staff_performance = {}
+        # Per-staff totals come from one outer-joined GROUP BY per table,
+        # so staff without activity in the period still get zero rows
+        transaction_totals = session.query(
+            User.id,
+            User.username,
+            User.role,
+            func.count(RefillTransaction.id),
+            func.coalesce(func.sum(RefillTransaction.gallons_count), 0),
+            func.coalesce(func.sum(RefillTransaction.total_amount), 0)
+        ).outerjoin(RefillTransaction, and_(
+            RefillTransaction.staff_id == User.id,
+            RefillTransaction.created_at >= start_datetime,
+            RefillTransaction.created_at < end_datetime
+        )).filter(User.role.in_(['admin', 'staff'])).group_by(User.id).order_by(User.id).all()
+        
+        expense_totals = {
+            user_id: (count, amount)
+            for user_id, count, amount in session.query(
+                User.id,
+                func.count(Expense.id),
+                func.coalesce(func.sum(Expense.amount), 0)
+            ).outerjoin(Expense, and_(
+                Expense.staff_id == User.id,
+                Expense.created_at >= start_datetime,
+                Expense.created_at < end_datetime
+            )).filter(User.role.in_(['admin', 'staff'])).group_by(User.id)
+        }
         
-        staff_members = session.query(User).filter(User.role.in_(['admin', 'staff'])).all()
+        staff_performance = {}
         
-        for staff in staff_members:
-            transactions = session.query(RefillTransaction).filter(
-                and_(
-                    RefillTransaction.staff_id == staff.id,
-                    RefillTransaction.created_at >= start_datetime,
-                    RefillTransaction.created_at <= end_datetime
-                )
-            ).all()
-            
-            expenses = session.query(Expense).filter(
-                and_(
-                    Expense.staff_id == staff.id,
-                    Expense.created_at >= start_datetime,
-                    Expense.created_at <= end_datetime
-                )
-            ).all()
-            
-            staff_performance[staff.username] = {
-                'user_id': staff.id,
-                'role': staff.role,
+        for user_id, username, role, transaction_count, total_gallons, total_revenue in transaction_totals:
+            expense_count, expense_amount = expense_totals.get(user_id, (0, 0))
+            staff_performance[username] = {
+                'user_id': user_id,
+                'role': role,
                 'transactions': {
-                    'count': len(transactions),
-                    'total_gallons': sum(t.gallons_count for t in transactions),
-                    'total_revenue': sum(t.total_amount for t in transactions)
+                    'count': transaction_count,
+                    'total_gallons': total_gallons,
+                    'total_revenue': total_revenue
                 },
                 'expenses': {
-                    'count': len(expenses),
-                    'total_amount': sum(e.amount for e in expenses)
+                    'count': expense_count,
+                    'total_amount': expense_amount
                 }
             }
         
@@ -233,9 +366,6 @@ def get_staff_performance_report(start_date: date, end_date: date) -> Dict[str,
 
 def export_transactions_csv(start_date: date, end_date: date, actor_id: int) -> str:
     """Export transactions to CSV format"""
-    sales_summary = get_sales_summary(start_date, end_date)
-    transactions = sales_summary['raw_transactions']
-    
     output = StringIO()
     writer = csv.writer(output)
     
@@ -252,25 +382,29 @@ def export_transactions_csv(start_date: date, end_date: date, actor_id: int) ->
         'Total Amount', 'Payment Type', 'Staff', 'Receipt'
     ])
     
-    for transaction in transactions:
-        writer.writerow([
-            transaction.id,
-            transaction.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-            transaction.customer_name or 'Walk-in',
-            transaction.gallons_count,
-            transaction.price_per_gallon,
-            transaction.total_amount,
-            transaction.payment_type,
-            transaction.staff.username if transaction.staff else 'Unknown',
-            'Yes' if transaction.receipt_path else 'No'
-        ])
+    # Each batch is formatted column-wise and written by pandas' CSV
+    # writer; the summary is tallied per batch, in row order
+    transaction_count = 0
+    total_gallons = 0
+    total_revenue = 0
+    
+    for frame in iter_transaction_frames(start_date, end_date):
+        transaction_count += len(frame)
+        total_gallons = sum(frame['gallons_count'].tolist(), total_gallons)
+        total_revenue = sum(frame['total_amount'].tolist(), total_revenue)
+        
+        frame['created_at'] = pd.to_datetime(frame['created_at']).dt.strftime('%Y-%m-%d %H:%M:%S')
+        frame['customer_name'] = frame['customer_name'].mask(frame['customer_name'].fillna('') == '', 'Walk-in')
+        frame['username'] = frame['username'].mask(frame['username'].fillna('') == '', 'Unknown')
+        frame['receipt_path'] = (frame['receipt_path'].fillna('') != '').map({True: 'Yes', False: 'No'})
+        frame.to_csv(output, header=False, index=False, lineterminator='\r\n')
     
     # Write summary
     writer.writerow([])
     writer.writerow(['SUMMARY'])
-    writer.writerow(['Total Transactions', len(transactions)])
-    writer.writerow(['Total Gallons', sum(t.gallons_count for t in transactions)])
-    writer.writerow(['Total Revenue', sum(t.total_amount for t in transactions)])
+    writer.writerow(['Total Transactions', transaction_count])
+    writer.writerow(['Total Gallons', total_gallons])
+    writer.writerow(['Total Revenue', total_revenue])
     
     csv_content = output.getvalue()
     output.close()
@@ -282,19 +416,15 @@ def export_transactions_csv(start_date: date, end_date: date, actor_id: int) ->
         data_dict={
             'start_date': start_date.isoformat(),
             'end_date': end_date.isoformat(),
-            'transaction_count': len(transactions),
+            'transaction_count': transaction_count,
             'format': 'CSV'
-        },
-        human_message=f"Exported {len(transactions)} transactions to CSV for period {start_date} to {end_date}"
+        }
     )
     
     return csv_content
 
 def export_expenses_csv(start_date: date, end_date: date, actor_id: int) -> str:
     """Export expenses to CSV format"""
-    expense_summary = get_expense_summary(start_date, end_date)
-    expenses = expense_summary['raw_expenses']
-    
     output = StringIO()
     writer = csv.writer(output)
     
@@ -310,23 +440,27 @@ def export_expenses_csv(start_date: date, end_date: date, actor_id: int) -> str:
         'ID', 'Date', 'Category', 'Amount', 'Vendor', 'Note', 'Staff', 'Receipt'
     ])
     
-    for expense in expenses:
-        writer.writerow([
-            expense.id,
-            expense.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-            expense.category,
-            expense.amount,
-            expense.vendor or '',
-            expense.note or '',
-            expense.staff.username if expense.staff else 'Unknown',
-            'Yes' if expense.receipt_path else 'No'
-        ])
+    # Each batch is formatted column-wise and written by pandas' CSV
+    # writer; the summary is tallied per batch, in row order
+    expense_count = 0
+    total_amount = 0
+    
+    for frame in iter_expense_frames(start_date, end_date):
+        expense_count += len(frame)
+        total_amount = sum(frame['amount'].tolist(), total_amount)
+        
+        frame['created_at'] = pd.to_datetime(frame['created_at']).dt.strftime('%Y-%m-%d %H:%M:%S')
+        frame['vendor'] = frame['vendor'].fillna('')
+        frame['note'] = frame['note'].fillna('')
+        frame['username'] = frame['username'].mask(frame['username'].fillna('') == '', 'Unknown')
+        frame['receipt_path'] = (frame['receipt_path'].fillna('') != '').map({True: 'Yes', False: 'No'})
+        frame.to_csv(output, header=False, index=False, lineterminator='\r\n')
     
     # Write summary
     writer.writerow([])
     writer.writerow(['SUMMARY'])
-    writer.writerow(['Total Expenses', len(expenses)])
-    writer.writerow(['Total Amount', sum(e.amount for e in expenses)])
+    writer.writerow(['Total Expenses', expense_count])
+    writer.writerow(['Total Amount', total_amount])
     
     csv_content = output.getvalue()
     output.close()
@@ -338,17 +472,23 @@ def export_expenses_csv(start_date: date, end_date: date, actor_id: int) -> str:
         data_dict={
             'start_date': start_date.isoformat(),
             'end_date': end_date.isoformat(),
-            'expense_count': len(expenses),
+            'expense_count': expense_count,
             'format': 'CSV'
-        },
-        human_message=f"Exported {len(expenses)} expenses to CSV for period {start_date} to {end_date}"
+        }
     )
     
     return csv_content
 
 def export_profit_loss_csv(start_date: date, end_date: date, actor_id: int) -> str:
     """Export profit & loss report to CSV"""
-    pl_report = get_profit_loss_report(start_date, end_date)
+    # The report totals and the category breakdown come from one session;
+    # the expense totals are not queried a second time
+    session = get_session()
+    try:
+        pl_report = _profit_loss_report(session, start_date, end_date)
+        expense_categories = _expense_category_breakdown(session, start_date, end_date)
+    finally:
+        session.close()
     
     output = StringIO()
     writer = csv.writer(output)
@@ -371,15 +511,15 @@ def export_profit_loss_csv(start_date: date, end_date: date, actor_id: int) -> s
     
     # Sales breakdown
     writer.writerow(['SALES BREAKDOWN'])
-    sales = pl_report['sales_summary']['transactions']
+    sales = pl_report['sales_totals']
     writer.writerow(['Total Transactions', sales['total_count']])
     writer.writerow(['Total Gallons Sold', sales['total_gallons']])
-    writer.writerow(['Average Price per Gallon', sales['avg_price_per_gallon']])
+    writer.writerow(['Average Price per Gallon', sales['total_revenue'] / sales['total_gallons'] if sales['total_gallons'] > 0 else 0])
     writer.writerow([])
     
     # Expense breakdown
     writer.writerow(['EXPENSE BREAKDOWN'])
-    for category, data in pl_report['expense_summary']['category_breakdown'].items():
+    for category, data in expense_categories.items():
         writer.writerow([f"{category} Expenses", data['amount']])
     
     csv_content = output.getvalue()
@@ -396,17 +536,13 @@ def export_profit_loss_csv(start_date: date, end_date: date, actor_id: int) -> s
             'expenses': pl_report['expenses'],
             'profit': pl_report['gross_profit'],
             'format': 'CSV'
-        },
-        human_message=f"Exported P&L report to CSV for period {start_date} to {end_date}"
+        }
     )
     
     return csv_content
 
 def export_inventory_csv(actor_id: int) -> str:
     """Export inventory to CSV"""
-    inventory_report = get_inventory_report()
-    items = inventory_report['all_items']
-    
     output = StringIO()
     writer = csv.writer(output)
     
@@ -421,23 +557,25 @@ def export_inventory_csv(actor_id: int) -> str:
         'ID', 'Name', 'Category', 'Quantity', 'Unit Cost', 'Total Value', 'Location', 'Last Updated'
     ])
     
-    for item in items:
-        writer.writerow([
-            item.id,
-            item.name,
-            item.category,
-            item.quantity,
-            item.unit_cost,
-            item.quantity * item.unit_cost,
-            item.location or '',
-            item.last_updated.strftime('%Y-%m-%d %H:%M:%S')
-        ])
+    # Each batch is formatted column-wise and written by pandas' CSV
+    # writer; the summary is tallied per batch, in row order
+    item_count = 0
+    total_value = 0
+    
+    for frame in iter_inventory_frames():
+        frame.insert(5, 'total_value', frame['quantity'] * frame['unit_cost'])
+        item_count += len(frame)
+        total_value = sum(frame['total_value'].tolist(), total_value)
+        
+        frame['location'] = frame['location'].fillna('')
+        frame['last_updated'] = pd.to_datetime(frame['last_updated']).dt.strftime('%Y-%m-%d %H:%M:%S')
+        frame.to_csv(output, header=False, index=False, lineterminator='\r\n')
     
     # Write summary
     writer.writerow([])
     writer.writerow(['SUMMARY'])
-    writer.writerow(['Total Items', len(items)])
-    writer.writerow(['Total Value', sum(item.quantity * item.unit_cost for item in items)])
+    writer.writerow(['Total Items', item_count])
+    writer.writerow(['Total Value', total_value])
     
     csv_content = output.getvalue()
     output.close()
@@ -447,11 +585,10 @@ def export_inventory_csv(actor_id: int) -> str:
         actor_id=actor_id,
         action_type='export_inventory',
         data_dict={
-            'item_count': len(items),
-            'total_value': sum(item.quantity * item.unit_cost for item in items),
+            'item_count': item_count,
+            'total_value': total_value,
             'format': 'CSV'
-        },
-        human_message=f"Exported inventory report to CSV ({len(items)} items)"
+        }
     )
     
     return csv_content
@@ -481,16 +618,13 @@ def export_ledger_csv(start_date: Optional[date], end_date: Optional[date], acto
         'ID', 'Timestamp', 'Previous Hash', 'Data Hash', 'Actor ID', 'Action Type', 'Data'
     ])
     
-    for entry in proof['entries']:
-        writer.writerow([
-            entry['id'],
-            entry['timestamp'],
-            entry['prev_hash'],
-            entry['data_hash'],
-            entry['actor_id'] or '',
-            entry['action_type'],
-            entry['data_text']
-        ])
+    # Written by pandas' CSV writer like the other exports; the nullable
+    # integer dtype keeps actor ids whole and leaves missing ones blank
+    frame = pd.DataFrame(proof['entries'], columns=[
+        'id', 'timestamp', 'prev_hash', 'data_hash', 'actor_id', 'action_type', 'data_text'
+    ])
+    frame['actor_id'] = frame['actor_id'].astype('Int64')
+    frame.to_csv(output, header=False, index=False, lineterminator='\r\n')
     
     csv_content = output.getvalue()
     output.close()
@@ -505,12 +639,17 @@ def export_ledger_csv(start_date: Optional[date], end_date: Optional[date], acto
             'entry_count': len(proof['entries']),
             'proof_hash': proof['proof_hash'],
             'format': 'CSV'
-        },
-        human_message=f"Exported ledger to CSV ({len(proof['entries'])} entries)"
+        }
     )
     
     return csv_content
 
+def _day_bucket(session, column):
+    """SQL expression truncating a datetime column to a 'YYYY-MM-DD' day key"""
+    if session.get_bind().dialect.name == 'postgresql':
+        return func.to_char(func.date_trunc('day', column), 'YYYY-MM-DD')
+    return func.strftime('%Y-%m-%d', column)
+
 def get_daily_sales_data(days: int = 7) -> List[Dict[str, Any]]:
     """Get daily sales data for charts"""
     session = get_session()
@@ -518,33 +657,40 @@ def get_daily_sales_data(days: int = 7) -> List[Dict[str, Any]]:
         # Get data for the last N days
         end_date = date.today()
         start_date = date.fromordinal(end_date.toordinal() - days + 1)
+        start_datetime, end_datetime = _day_bounds(start_date, end_date)
+        
+        # One grouped query per table for the whole window, keyed by day
+        transaction_day = _day_bucket(session, RefillTransaction.created_at)
+        daily_transactions = {
+            day: (count, gallons, revenue)
+            for day, count, gallons, revenue in session.query(
+                transaction_day,
+                func.count(RefillTransaction.id),
+                func.sum(RefillTransaction.gallons_count),
+                func.sum(RefillTransaction.total_amount)
+            ).filter(
+                RefillTransaction.created_at >= start_datetime,
+                RefillTransaction.created_at < end_datetime
+            ).group_by(transaction_day)
+        }
+        
+        expense_day = _day_bucket(session, Expense.created_at)
+        daily_expense_totals = dict(
+            session.query(expense_day, func.sum(Expense.amount)).filter(
+                Expense.created_at >= start_datetime,
+                Expense.created_at < end_datetime
+            ).group_by(expense_day).all()
+        )
         
         daily_data = []
         
+        # Walk every day so days without activity still get a zero row
         for i in range(days):
             current_date = date.fromordinal(start_date.toordinal() + i)
-            start_datetime = datetime.combine(current_date, datetime.min.time())
-            end_datetime = datetime.combine(current_date, datetime.max.time())
-            
-            # Get transactions for this day
-            transactions = session.query(RefillTransaction).filter(
-                and_(
-                    RefillTransaction.created_at >= start_datetime,
-                    RefillTransaction.created_at <= end_datetime
-                )
-            ).all()
-            
-            # Get expenses for this day
-            expenses = session.query(Expense).filter(
-                and_(
-                    Expense.created_at >= start_datetime,
-                    Expense.created_at <= end_datetime
-                )
-            ).all()
+            day = current_date.isoformat()
             
-            daily_revenue = sum(t.total_amount for t in transactions)
-            daily_expenses = sum(e.amount for e in expenses)
-            daily_gallons = sum(t.gallons_count for t in transactions)
+            transaction_count, daily_gallons, daily_revenue = daily_transactions.get(day, (0, 0, 0))
+            daily_expenses = daily_expense_totals.get(day, 0)
             
             daily_data.append({
                 'date': current_date,
@@ -552,7 +698,7 @@ def get_daily_sales_data(days: int = 7) -> List[Dict[str, Any]]:
                 'expenses': daily_expenses,
                 'profit': daily_revenue - daily_expenses,
                 'gallons': daily_gallons,
-                'transactions': len(transactions)
+                'transactions': transaction_count
             })
         
         return daily_data
@@ -3,7 +3,11 @@ File storage system for receipts and documents
 """
 
 import os
+import glob
 import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from typing import Optional, Tuple
 from pathlib import Path
@@ -13,6 +17,16 @@ from hydrohub.validations import validate_file_upload
 RECEIPTS_DIR = os.getenv('RECEIPTS_DIR', 'data/receipts')
 MAX_FILE_SIZE_MB = int(os.getenv('MAX_FILE_SIZE_MB', '5'))
 ALLOWED_EXTENSIONS = ['pdf', 'jpg', 'jpeg', 'png']
+# Uploads are hashed and written in blocks of this size
+HASH_CHUNK_SIZE = 64 * 1024
+
+# Recently saved or found receipts, content hash -> path
+_RECENT_RECEIPTS_SIZE = 128
+_recent_receipts = OrderedDict()
+_recent_receipts_lock = threading.Lock()
+
+# Last storage stats, reused while no scanned directory's mtime has changed
+_stats_cache = {'dir_mtimes': None, 'data': None}
 
 def ensure_receipts_directory():
     """Ensure receipts directory exists"""
@@ -28,6 +42,30 @@ def generate_filename(original_filename: str, file_hash: str) -> str:
     extension = original_filename.split('.')[-1].lower() if '.' in original_filename else 'bin'
     return f"{timestamp}_{file_hash[:16]}.{extension}"
 
+def _remember_receipt(file_hash: str, file_path: str):
+    """Record where the receipt with this content hash is stored"""
+    with _recent_receipts_lock:
+        _recent_receipts[file_hash] = file_path
+        _recent_receipts.move_to_end(file_hash)
+        if len(_recent_receipts) > _RECENT_RECEIPTS_SIZE:
+            _recent_receipts.popitem(last=False)
+
+def find_receipt(file_hash: str) -> Optional[str]:
+    """Path of a stored receipt with this SHA-256 content hash, if any"""
+    with _recent_receipts_lock:
+        file_path = _recent_receipts.get(file_hash)
+    if file_path and os.path.exists(file_path):
+        return file_path
+    
+    # Stored names end in _<first 16 hash chars>.<ext>; confirm the full
+    # hash before treating a name match as the same content
+    pattern = os.path.join(glob.escape(RECEIPTS_DIR), f"*_{file_hash[:16]}.*")
+    for file_path in sorted(glob.glob(pattern)):
+        if verify_file_integrity(file_path, file_hash):
+            _remember_receipt(file_hash, file_path)
+            return file_path
+    return None
+
 def save_receipt(file_obj) -> Tuple[str, str]:
     """
     Save uploaded receipt file
@@ -36,7 +74,8 @@ def save_receipt(file_obj) -> Tuple[str, str]:
         file_obj: Streamlit uploaded file object
     
     Returns:
-        Tuple of (file_path, file_hash)
+        Tuple of (file_path, file_hash); re-uploading content that is
+        already stored returns the existing file's path
     """
     # Validate file
     validate_file_upload(file_obj, ALLOWED_EXTENSIONS, MAX_FILE_SIZE_MB)
@@ -44,24 +83,36 @@ def save_receipt(file_obj) -> Tuple[str, str]:
     # Ensure directory exists
     ensure_receipts_directory()
     
-    # Read file content
-    file_content = file_obj.read()
-    file_obj.seek(0)  # Reset file pointer
-    
-    # Generate hash
-    file_hash = generate_file_hash(file_content)
-    
-    # Generate filename
-    filename = generate_filename(file_obj.name, file_hash)
-    file_path = os.path.join(RECEIPTS_DIR, filename)
-    
-    # Check if file already exists (same hash)
-    if os.path.exists(file_path):
-        return file_path, file_hash
-    
-    # Save file
-    with open(file_path, 'wb') as f:
-        f.write(file_content)
+    # Hash and write the upload in chunks to a temporary file next to its
+    # destination, since the final name depends on the hash
+    digest = hashlib.sha256()
+    fd, temp_path = tempfile.mkstemp(dir=RECEIPTS_DIR, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            while chunk := file_obj.read(HASH_CHUNK_SIZE):
+                digest.update(chunk)
+                f.write(chunk)
+        file_obj.seek(0)  # Reset file pointer
+        
+        file_hash = digest.hexdigest()
+        
+        # Check if the same content is already stored
+        existing_path = find_receipt(file_hash)
+        if existing_path:
+            os.remove(temp_path)
+            return existing_path, file_hash
+        
+        # Generate filename
+        filename = generate_filename(file_obj.name, file_hash)
+        file_path = os.path.join(RECEIPTS_DIR, filename)
+        
+        # Move into place; the rename stays on one filesystem
+        os.replace(temp_path, file_path)
+        _remember_receipt(file_hash, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
     
     return file_path, file_hash
 
@@ -108,10 +159,11 @@ def verify_file_integrity(file_path: str, expected_hash: str) -> bool:
         if not os.path.exists(file_path):
             return False
         
+        # file_digest() hashes straight from the file in fixed-size blocks
+        # instead of reading it into memory first
         with open(file_path, 'rb') as f:
-            content = f.read()
+            actual_hash = hashlib.file_digest(f, 'sha256').hexdigest()
         
-        actual_hash = generate_file_hash(content)
         return actual_hash == expected_hash
         
     except Exception:
@@ -123,30 +175,60 @@ def cleanup_orphaned_files():
     # Implementation would depend on specific cleanup policy
     pass
 
+def _iter_file_sizes(directory: str, dir_mtimes: dict):
+    """Yield the size of every file under directory
+    
+    os.scandir entries carry their file type, so only the size lookup
+    costs a stat call per file. Each directory's mtime is recorded in
+    dir_mtimes before it is listed, so a change made mid-walk is picked
+    up on the next call.
+    """
+    dir_mtimes[directory] = os.stat(directory).st_mtime_ns
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from _iter_file_sizes(entry.path, dir_mtimes)
+                elif entry.is_file():
+                    yield entry.stat().st_size
+            except OSError:
+                continue
+
+def _directories_unchanged(dir_mtimes: dict) -> bool:
+    """Whether every directory still exists with the recorded mtime"""
+    try:
+        return all(os.stat(path).st_mtime_ns == mtime for path, mtime in dir_mtimes.items())
+    except OSError:
+        return False
+
 def get_storage_stats() -> dict:
     """Get storage statistics"""
     try:
         ensure_receipts_directory()
         
+        # Adding or removing a file only bumps the mtime of the directory
+        # it is in, so the cache holds on while every scanned directory
+        # is unchanged; that costs one stat per directory, not per file
+        if _stats_cache['dir_mtimes'] is not None and _directories_unchanged(_stats_cache['dir_mtimes']):
+            return dict(_stats_cache['data'])
+        
         total_files = 0
         total_size = 0
+        dir_mtimes = {}
         
-        for root, dirs, files in os.walk(RECEIPTS_DIR):
-            for file in files:
-                file_path = os.path.join(root, file)
-                try:
-                    size = os.path.getsize(file_path)
-                    total_files += 1
-                    total_size += size
-                except Exception:
-                    continue
+        for size in _iter_file_sizes(RECEIPTS_DIR, dir_mtimes):
+            total_files += 1
+            total_size += size
         
-        return {
+        stats = {
             'total_files': total_files,
             'total_size_bytes': total_size,
             'total_size_mb': round(total_size / (1024 * 1024), 2),
             'receipts_directory': RECEIPTS_DIR
         }
+        _stats_cache['dir_mtimes'] = dir_mtimes
+        _stats_cache['data'] = stats
+        return dict(stats)
         
     except Exception as e:
         return {
@@ -3,9 +3,21 @@ Reusable Streamlit UI components
 """
 
 import streamlit as st
-from datetime import datetime, date
+import pandas as pd
+from datetime import date
 from typing import Optional, Dict, Any, List
-from hydrohub.utils import format_money, format_datetime, get_business_config
+from hydrohub.utils import (
+    format_money, format_datetime, get_business_config, get_manila_timezone,
+    get_current_time, DATETIME_DISPLAY_FORMAT
+)
+
+# Navigation entries per role; unknown roles only see the dashboard
+_MENU_BY_ROLE = {
+    'admin': ("Dashboard", "Record Refill", "Inventory", "Expenses", "Reports",
+              "Staff Management", "Ledger", "Settings"),
+    'staff': ("Dashboard", "Record Refill", "Inventory", "Expenses", "Reports"),
+    'public': ("Dashboard", "Reports"),
+}
 
 def show_header():
     """Display application header"""
@@ -18,31 +30,22 @@ def show_user_info(user: Dict[str, Any]):
     st.sidebar.success(f"👤 {user['username']}")
     st.sidebar.caption(f"Role: {user['role'].title()}")
     if user.get('last_login'):
-        st.sidebar.caption(f"Last login: {format_datetime(user['last_login'])}")
+        # Reformat only when the login timestamp changes, not on every rerun
+        last_login = st.session_state.get('_last_login_display')
+        if last_login is None or last_login[0] != user['last_login']:
+            last_login = (user['last_login'], format_datetime(user['last_login']))
+            st.session_state['_last_login_display'] = last_login
+        st.sidebar.caption(f"Last login: {last_login[1]}")
 
 def show_logout_button():
     """Display logout button"""
     if st.sidebar.button("🚪 Logout", type="secondary"):
-        for key in list(st.session_state.keys()):
-            del st.session_state[key]
+        st.session_state.clear()
         st.rerun()
 
 def show_navigation_menu(user_role: str) -> str:
     """Display navigation menu based on user role"""
-    # Base menu items available to all users
-    menu_items = ["Dashboard"]
-    
-    # Role-based menu items
-    if user_role in ['admin', 'staff']:
-        menu_items.extend(["Record Refill", "Inventory", "Expenses"])
-    
-    if user_role in ['admin', 'staff', 'public']:
-        menu_items.append("Reports")
-    
-    if user_role == 'admin':
-        menu_items.extend(["Staff Management", "Ledger", "Settings"])
-    
-    return st.sidebar.radio("Navigation", menu_items)
+    return st.sidebar.radio("Navigation", _MENU_BY_ROLE.get(user_role, ("Dashboard",)))
 
 def show_confirmation_modal(title: str, message: str, key: str) -> bool:
     """Show confirmation modal dialog"""
@@ -94,19 +97,18 @@ def show_data_table(data: List[Dict], columns: List[str], key: str = "table"):
         st.info("No data available")
         return
     
-    # Convert to display format
-    display_data = []
-    for item in data:
-        row = {}
-        for col in columns:
-            value = item.get(col, "")
-            # Format specific column types
-            if col.endswith('_at') or col.endswith('_time'):
-                value = format_datetime(value) if value else ""
-            elif col.endswith('_amount') or col.endswith('_cost') or col.endswith('_price'):
-                value = format_money(value) if value is not None else ""
-            row[col] = value
-        display_data.append(row)
+    # Convert to display format, a whole column at a time
+    display_data = pd.DataFrame(data, columns=columns, dtype=object)
+    for col in columns:
+        # Format specific column types
+        if col.endswith(('_at', '_time')):
+            timestamps = pd.to_datetime(display_data[col], errors='coerce', utc=True)
+            display_data[col] = timestamps.dt.tz_convert(get_manila_timezone()).dt.strftime(DATETIME_DISPLAY_FORMAT).fillna("")
+        elif col.endswith(('_amount', '_cost', '_price')):
+            display_data[col] = display_data[col].map(format_money, na_action='ignore').fillna("")
+        else:
+            # Missing keys and None values show as blank cells
+            display_data[col] = display_data[col].fillna("")
     
     st.dataframe(display_data, use_container_width=True, key=key)
 
@@ -139,31 +141,30 @@ def show_file_uploader(label: str, key: str, help_text: Optional[str] = None):
         key=key
     )
 
+# Prebuilt badge labels, keyed by lowercase value
+_STATUS_BADGES = {
+    'active': '🟢 Active',
+    'inactive': '🔴 Inactive',
+    'pending': '🟡 Pending',
+    'completed': '✅ Completed',
+    'cancelled': '❌ Cancelled',
+    'approved': '✅ Approved',
+    'rejected': '❌ Rejected'
+}
+
+_ROLE_BADGES = {
+    'admin': '👑 Admin',
+    'staff': '👤 Staff',
+    'public': '👁️ Public'
+}
+
 def show_status_badge(status: str) -> str:
     """Display status badge with appropriate color"""
-    status_colors = {
-        'active': '🟢',
-        'inactive': '🔴',
-        'pending': '🟡',
-        'completed': '✅',
-        'cancelled': '❌',
-        'approved': '✅',
-        'rejected': '❌'
-    }
-    
-    color = status_colors.get(status.lower(), '⚪')
-    return f"{color} {status.title()}"
+    return _STATUS_BADGES.get(status) or _STATUS_BADGES.get(status.lower()) or f"⚪ {status.title()}"
 
 def show_role_badge(role: str) -> str:
     """Display role badge"""
-    role_icons = {
-        'admin': '👑',
-        'staff': '👤',
-        'public': '👁️'
-    }
-    
-    icon = role_icons.get(role.lower(), '👤')
-    return f"{icon} {role.title()}"
+    return _ROLE_BADGES.get(role) or _ROLE_BADGES.get(role.lower()) or f"👤 {role.title()}"
 
 def show_loading_spinner(message: str = "Loading..."):
     """Show loading spinner"""
@@ -233,6 +234,12 @@ def show_kpi_dashboard(kpis: List[Dict[str, Any]]):
                 help_text=kpi.get('help')
             )
 
+@st.cache_data(max_entries=32, show_spinner=False)
+def _load_receipt_bytes(path: str, mtime: float, size: int) -> bytes:
+    """Read a receipt file; mtime and size key the cache so edits are picked up"""
+    with open(path, 'rb') as f:
+        return f.read()
+
 def show_receipt_preview(receipt_path: str):
     """Show receipt preview if available"""
     if not receipt_path:
@@ -240,17 +247,27 @@ def show_receipt_preview(receipt_path: str):
     
     try:
         import os
-        if os.path.exists(receipt_path):
+        import stat
+        import mimetypes
+        
+        # One stat call both checks for a regular file and keys the cache
+        try:
+            file_stat = os.stat(receipt_path)
+        except OSError:
+            return
+        
+        if stat.S_ISREG(file_stat.st_mode):
+            data = _load_receipt_bytes(receipt_path, file_stat.st_mtime, file_stat.st_size)
             with st.expander("📄 Receipt"):
                 if receipt_path.lower().endswith(('.jpg', '.jpeg', '.png')):
-                    st.image(receipt_path, caption="Receipt", use_column_width=True)
+                    st.image(data, caption="Receipt", use_column_width=True)
                 else:
                     st.write(f"Receipt file: {os.path.basename(receipt_path)}")
                     st.download_button(
                         "Download Receipt",
-                        data=open(receipt_path, 'rb').read(),
+                        data=data,
                         file_name=os.path.basename(receipt_path),
-                        mime="application/octet-stream"
+                        mime=mimetypes.guess_type(receipt_path)[0] or "application/octet-stream"
                     )
     except Exception as e:
         st.warning(f"Could not load receipt: {e}")
@@ -269,7 +286,7 @@ def show_printable_receipt(transaction_data: Dict[str, Any]):
         {config['location']}  
         
         **Transaction ID:** {transaction_data.get('id', 'N/A')}  
-        **Date:** {format_datetime(transaction_data.get('created_at', datetime.now()))}  
+        **Date:** {format_datetime(transaction_data.get('created_at') or get_current_time())}  
         **Staff:** {transaction_data.get('staff_name', 'N/A')}  
         """)
         
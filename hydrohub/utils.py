@@ -3,8 +3,10 @@ Utility functions for HydroHub application
 """
 
 import os
-from datetime import datetime
-import pytz
+import functools
+from datetime import datetime, timezone
+from types import MappingProxyType
+from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -16,9 +18,15 @@ CURRENCY_SYMBOL = os.getenv('CURRENCY_SYMBOL', '₱')
 BUSINESS_NAME = os.getenv('BUSINESS_NAME', 'HydroHub Cantilan')
 BUSINESS_LOCATION = os.getenv('BUSINESS_LOCATION', 'Cantilan, Surigao del Sur, Philippines')
 
+# Timezone objects are resolved once; ZoneInfo instances are cached per key
+_MANILA_TZ = ZoneInfo(TIMEZONE)
+_UTC = timezone.utc
+
+DATETIME_DISPLAY_FORMAT = '%Y-%m-%d %I:%M %p'
+
 def get_manila_timezone():
     """Get Manila timezone object"""
-    return pytz.timezone(TIMEZONE)
+    return _MANILA_TZ
 
 def get_current_time():
     """Get current time in Manila timezone"""
@@ -29,25 +37,27 @@ def get_current_date():
     """Get current date in Manila timezone"""
     return get_current_time().date()
 
+# Bound str.format for money values; braces in the symbol are escaped
+_money_fmt = (CURRENCY_SYMBOL.replace('{', '{{').replace('}', '}}') + '{:,.2f}').format
+_ZERO_MONEY = _money_fmt(0.0)
+
 def format_money(amount):
     """Format amount as Philippine peso"""
-    if amount is None:
-        return f"{CURRENCY_SYMBOL}0.00"
-    return f"{CURRENCY_SYMBOL}{amount:,.2f}"
+    return _ZERO_MONEY if amount is None else _money_fmt(amount)
 
 def format_datetime(dt):
     """Format datetime for display"""
     if isinstance(dt, str):
         # Parse ISO string
-        dt = datetime.fromisoformat(dt.replace('Z', '+00:00'))
+        dt = datetime.fromisoformat(dt[:-1] + '+00:00' if dt.endswith('Z') else dt)
     
-    # Convert to Manila timezone if needed
-    manila_tz = get_manila_timezone()
     if dt.tzinfo is None:
-        dt = pytz.utc.localize(dt)
+        dt = dt.replace(tzinfo=_UTC)
     
-    dt_manila = dt.astimezone(manila_tz)
-    return dt_manila.strftime('%Y-%m-%d %I:%M %p')
+    # Convert to Manila timezone if needed
+    if dt.tzinfo is not _MANILA_TZ:
+        dt = dt.astimezone(_MANILA_TZ)
+    return dt.strftime(DATETIME_DISPLAY_FORMAT)
 
 def format_date(date_obj):
     """Format date for display"""
@@ -55,15 +65,20 @@ def format_date(date_obj):
         date_obj = datetime.fromisoformat(date_obj).date()
     return date_obj.strftime('%Y-%m-%d')
 
+@functools.lru_cache(maxsize=1)
 def get_business_config():
-    """Get business configuration"""
-    return {
+    """Get business configuration
+    
+    Built once per process and shared read-only; call
+    get_business_config.cache_clear() after changing the environment.
+    """
+    return MappingProxyType({
         'name': BUSINESS_NAME,
         'location': BUSINESS_LOCATION,
         'currency_symbol': CURRENCY_SYMBOL,
         'timezone': TIMEZONE,
         'default_price_per_gallon': float(os.getenv('DEFAULT_PRICE_PER_GALLON', '25.00'))
-    }
+    })
 
 def validate_positive_number(value, field_name):
     """Validate that a number is positive"""
@@ -2,18 +2,40 @@
 Data validation functions for HydroHub
 """
 
+import os
 import re
 from typing import Any, List
 
+# Usernames: letters, numbers and underscores only
+_USERNAME_RE = re.compile(r'\A[a-zA-Z0-9_]+\Z')
+
+# Allowed values, checked by set lookup; the messages keep the listed order
+_PAYMENT_TYPE_CHOICES = ('Cash', 'GCash', 'PayMaya', 'Bank Transfer', 'On-account')
+_PAYMENT_TYPES = frozenset(_PAYMENT_TYPE_CHOICES)
+_PAYMENT_TYPES_MSG = f"Payment type must be one of: {', '.join(_PAYMENT_TYPE_CHOICES)}"
+
+_USER_ROLE_CHOICES = ('admin', 'staff', 'public')
+_USER_ROLES = frozenset(_USER_ROLE_CHOICES)
+_USER_ROLES_MSG = f"Role must be one of: {', '.join(_USER_ROLE_CHOICES)}"
+
+# Water refill station specific categories
+_EXPENSE_CATEGORY_CHOICES = (
+    'Water Supply', 'Filters', 'Containers', 'Equipment Maintenance',
+    'Transportation', 'Supplies', 'Other'
+)
+_EXPENSE_CATEGORIES = frozenset(_EXPENSE_CATEGORY_CHOICES)
+_EXPENSE_CATEGORIES_MSG = f"Category must be one of: {', '.join(_EXPENSE_CATEGORY_CHOICES)}"
+
 class ValidationError(Exception):
     """Custom validation error"""
     pass
 
 def required_non_empty_str(field_name: str, value: Any) -> str:
     """Validate that a field is a non-empty string"""
-    if not value or not isinstance(value, str) or not value.strip():
+    stripped = value.strip() if isinstance(value, str) else ''
+    if not stripped:
         raise ValidationError(f"{field_name} is required and cannot be empty")
-    return value.strip()
+    return stripped
 
 def validate_positive_int(field_name: str, value: Any, min_value: int = 0) -> int:
     """Validate that a field is a positive integer"""
@@ -37,16 +59,14 @@ def validate_positive_decimal(field_name: str, value: Any, min_value: float = 0.
 
 def validate_payment_type(payment_type: str) -> str:
     """Validate payment type"""
-    allowed_types = ['Cash', 'GCash', 'PayMaya', 'Bank Transfer', 'On-account']
-    if payment_type not in allowed_types:
-        raise ValidationError(f"Payment type must be one of: {', '.join(allowed_types)}")
+    if payment_type not in _PAYMENT_TYPES:
+        raise ValidationError(_PAYMENT_TYPES_MSG)
     return payment_type
 
 def validate_user_role(role: str) -> str:
     """Validate user role"""
-    allowed_roles = ['admin', 'staff', 'public']
-    if role not in allowed_roles:
-        raise ValidationError(f"Role must be one of: {', '.join(allowed_roles)}")
+    if role not in _USER_ROLES:
+        raise ValidationError(_USER_ROLES_MSG)
     return role
 
 def validate_username(username: str) -> str:
@@ -60,7 +80,7 @@ def validate_username(username: str) -> str:
         raise ValidationError("Username must be no more than 50 characters long")
     
     # Check format (alphanumeric and underscore only)
-    if not re.match(r'^[a-zA-Z0-9_]+$', username):
+    if not _USERNAME_RE.match(username):
         raise ValidationError("Username can only contain letters, numbers, and underscores")
     
     return username
@@ -93,14 +113,8 @@ def validate_expense_category(category: str) -> str:
     """Validate expense category"""
     category = required_non_empty_str("Category", category)
     
-    # Water refill station specific categories
-    valid_categories = [
-        'Water Supply', 'Filters', 'Containers', 'Equipment Maintenance',
-        'Transportation', 'Supplies', 'Other'
-    ]
-    
-    if category not in valid_categories:
-        raise ValidationError(f"Category must be one of: {', '.join(valid_categories)}")
+    if category not in _EXPENSE_CATEGORIES:
+        raise ValidationError(_EXPENSE_CATEGORIES_MSG)
     
     if len(category) > 50:
         raise ValidationError("Category must be no more than 50 characters long")
@@ -111,11 +125,6 @@ def validate_inventory_category(category: str) -> str:
     """Validate inventory category"""
     category = required_non_empty_str("Category", category)
     
-    # Common inventory categories
-    suggested_categories = [
-        'Water', 'Containers', 'Equipment', 'Supplies', 'Chemicals', 'Other'
-    ]
-    
     if len(category) > 50:
         raise ValidationError("Category must be no more than 50 characters long")
     
@@ -132,8 +141,10 @@ def validate_file_upload(file_obj, allowed_extensions: List[str] = None, max_siz
     
     # Check file extension
     if allowed_extensions:
-        file_extension = file_obj.name.split('.')[-1].lower() if '.' in file_obj.name else ''
-        if file_extension not in [ext.lower() for ext in allowed_extensions]:
+        file_extension = os.path.splitext(file_obj.name)[1][1:].lower()
+        # Extension lists are normally lowercase already; only lower them on a miss
+        if (file_extension not in allowed_extensions
+                and file_extension not in {ext.lower() for ext in allowed_extensions}):
             raise ValidationError(f"File type must be one of: {', '.join(allowed_extensions)}")
     
     return file_obj
@@ -174,14 +185,12 @@ def validate_expense_data(data: dict) -> dict:
     validated['amount'] = validate_positive_decimal('Amount', data.get('amount'), min_value=0.01)
     
     # Vendor (optional)
-    vendor = data.get('vendor', '').strip()
-    if vendor and len(vendor) > 100:
+    if len(vendor := (data.get('vendor') or '').strip()) > 100:
         raise ValidationError("Vendor name must be no more than 100 characters long")
     validated['vendor'] = vendor
     
     # Note (optional)
-    note = data.get('note', '').strip()
-    if note and len(note) > 500:
+    if len(note := (data.get('note') or '').strip()) > 500:
         raise ValidationError("Note must be no more than 500 characters long")
     validated['note'] = note
     
@@ -210,8 +219,7 @@ def validate_inventory_item(data: dict) -> dict:
     validated['unit_cost'] = validate_positive_decimal('Unit cost', data.get('unit_cost'), min_value=0.0)
     
     # Location (optional)
-    location = data.get('location', '').strip()
-    if location and len(location) > 100:
+    if len(location := (data.get('location') or '').strip()) > 100:
         raise ValidationError("Location must be no more than 100 characters long")
     validated['location'] = location
     
@@ -3,11 +3,15 @@ Expense Management Page
 """
 
 import streamlit as st
-from datetime import datetime, date
-from hydrohub.models import Expense, User
+import pandas as pd
+from datetime import date
+from sqlalchemy import func
+from sqlalchemy.orm import selectinload
+from hydrohub.models import Expense
 from hydrohub.db import get_session
 from hydrohub.validations import validate_expense_data, ValidationError
 from hydrohub.ledger import log_expense
+from hydrohub.reports import _day_bounds
 from hydrohub.storage import save_receipt
 from hydrohub.ui_components import (
     show_error_message, show_success_message, show_file_uploader, 
@@ -15,6 +19,9 @@ from hydrohub.ui_components import (
 )
 from hydrohub.utils import format_money, format_datetime
 
+# Expense detail rows loaded per "Load more" click
+EXPENSE_PAGE_SIZE = 50
+
 def show_expenses_page(user, permissions):
     """Display expense management page"""
     st.header("💰 Expense Management")
@@ -48,59 +55,78 @@ def show_recent_expenses():
             "Transportation", "Supplies", "Other"
         ])
     
+    # Show the first page again whenever the filters change
+    page_filters = (start_date, end_date, category_filter)
+    if st.session_state.get('recent_expenses_filters') != page_filters:
+        st.session_state['recent_expenses_filters'] = page_filters
+        st.session_state['recent_expenses_limit'] = EXPENSE_PAGE_SIZE
+    
     # Get expenses
     session = get_session()
     try:
-        query = session.query(Expense).join(User, Expense.staff_id == User.id, isouter=True)
-        
         # Apply date filter
-        start_datetime = datetime.combine(start_date, datetime.min.time())
-        end_datetime = datetime.combine(end_date, datetime.max.time())
-        query = query.filter(Expense.created_at >= start_datetime, Expense.created_at <= end_datetime)
+        start_datetime, end_datetime = _day_bounds(start_date, end_date)
+        filters = [Expense.created_at >= start_datetime, Expense.created_at < end_datetime]
         
         # Apply category filter
         if category_filter != "All":
-            query = query.filter(Expense.category == category_filter)
+            filters.append(Expense.category == category_filter)
         
-        expenses = query.order_by(Expense.created_at.desc()).all()
+        # Summary metrics are aggregated by the database
+        expense_count, total_amount = session.query(
+            func.count(Expense.id),
+            func.coalesce(func.sum(Expense.amount), 0.0)
+        ).filter(*filters).one()
         
-        if not expenses:
+        if not expense_count:
             st.info("No expenses found for the selected criteria.")
             return
         
-        # Summary metrics
-        total_amount = sum(e.amount for e in expenses)
-        avg_amount = total_amount / len(expenses) if expenses else 0
+        avg_amount = total_amount / expense_count
         
         col1, col2, col3 = st.columns(3)
         with col1:
             st.metric("Total Expenses", format_money(total_amount))
         with col2:
-            st.metric("Number of Expenses", len(expenses))
+            st.metric("Number of Expenses", expense_count)
         with col3:
             st.metric("Average Amount", format_money(avg_amount))
         
-        # Expenses table
+        # Expenses table; only the rows shown so far are loaded
         st.subheader("💸 Expense Details")
         
-        for expense in expenses:
-            with st.expander(f"{expense.category} - {format_money(expense.amount)} ({format_datetime(expense.created_at)})"):
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.write(f"**Amount:** {format_money(expense.amount)}")
-                    st.write(f"**Category:** {expense.category}")
-                    st.write(f"**Vendor:** {expense.vendor or 'N/A'}")
-                    st.write(f"**Staff:** {expense.staff.username if expense.staff else 'Unknown'}")
-                
-                with col2:
-                    st.write(f"**Date:** {format_datetime(expense.created_at)}")
-                    if expense.note:
-                        st.write(f"**Note:** {expense.note}")
-                    
-                    # Show receipt if available
-                    if expense.receipt_path:
-                        show_receipt_preview(expense.receipt_path)
+        limit = st.session_state['recent_expenses_limit']
+        # Staff names for the whole page are fetched in one extra IN query
+        expenses = session.query(Expense).options(selectinload(Expense.staff)).filter(
+            *filters
+        ).order_by(Expense.created_at.desc()).limit(limit).all()
+        
+        # One table for the whole page instead of an expander per expense
+        st.dataframe(pd.DataFrame([{
+            'ID': expense.id,
+            'Date': format_datetime(expense.created_at),
+            'Category': expense.category,
+            'Amount': format_money(expense.amount),
+            'Vendor': expense.vendor or 'N/A',
+            'Staff': expense.staff.username if expense.staff else 'Unknown',
+            'Note': expense.note or '',
+            'Receipt': 'Yes' if expense.receipt_path else 'No'
+        } for expense in expenses]), use_container_width=True, hide_index=True)
+        
+        # Only the selected expense's receipt is loaded
+        with_receipts = {
+            f"#{expense.id} {expense.category} - {format_money(expense.amount)} ({format_datetime(expense.created_at)})": expense.receipt_path
+            for expense in expenses if expense.receipt_path
+        }
+        if with_receipts:
+            selected_receipt = st.selectbox("View receipt", ["None"] + list(with_receipts), key="expense_receipt_select")
+            if selected_receipt != "None":
+                show_receipt_preview(with_receipts[selected_receipt])
+        
+        if expense_count > len(expenses):
+            if st.button(f"Load more ({expense_count - len(expenses)} remaining)", key="load_more_expenses"):
+                st.session_state['recent_expenses_limit'] = limit + EXPENSE_PAGE_SIZE
+                st.rerun()
         
     finally:
         session.close()
@@ -155,7 +181,6 @@ def show_add_expense_form(user):
                     expense = Expense(**validated_data)
                     session.add(expense)
                     session.commit()
-                    session.refresh(expense)
                     
                     # Log to ledger
                     ledger_data = validated_data.copy()
@@ -165,7 +190,8 @@ def show_add_expense_form(user):
                     log_expense(
                         actor_id=user['id'],
                         expense_id=expense.id,
-                        expense_data=ledger_data
+                        expense_data=ledger_data,
+                        session=session
                     )
                     
                     show_success_message(
@@ -192,48 +218,51 @@ def show_expense_analysis():
         session = get_session()
         try:
             # Get expenses in date range
-            start_datetime = datetime.combine(start_date, datetime.min.time())
-            end_datetime = datetime.combine(end_date, datetime.max.time())
+            start_datetime, end_datetime = _day_bounds(start_date, end_date)
             
-            expenses = session.query(Expense).filter(
+            date_filters = (
                 Expense.created_at >= start_datetime,
-                Expense.created_at <= end_datetime
-            ).all()
+                Expense.created_at < end_datetime
+            )
+            
+            # Category breakdown, grouped by the database
+            category_rows = session.query(
+                Expense.category,
+                func.sum(Expense.amount),
+                func.count(Expense.id)
+            ).filter(*date_filters).group_by(Expense.category).all()
             
-            if not expenses:
+            if not category_rows:
                 st.info("No expenses found for the selected period.")
                 return
             
-            # Category breakdown
-            category_totals = {}
-            for expense in expenses:
-                if expense.category not in category_totals:
-                    category_totals[expense.category] = 0
-                category_totals[expense.category] += expense.amount
+            category_frame = pd.DataFrame(category_rows, columns=['category', 'amount', 'count']).set_index('category')
+            category_totals = category_frame['amount'].sort_values(ascending=False, kind='stable')
+            total_expenses = category_totals.sum()
+            expense_count = category_frame['count'].sum()
+            percentages = category_totals / total_expenses * 100
             
             # Display analysis
             col1, col2 = st.columns(2)
             
             with col1:
                 st.write("**📋 Category Breakdown**")
-                for category, total in sorted(category_totals.items(), key=lambda x: x[1], reverse=True):
-                    percentage = (total / sum(category_totals.values())) * 100
+                for category, total, percentage in zip(category_totals.index, category_totals, percentages):
                     st.write(f"• {category}: {format_money(total)} ({percentage:.1f}%)")
             
             with col2:
                 st.write("**📈 Summary Statistics**")
-                total_expenses = sum(category_totals.values())
-                avg_expense = total_expenses / len(expenses)
+                avg_expense = total_expenses / expense_count
                 days = (end_date - start_date).days + 1
                 daily_avg = total_expenses / days if days > 0 else 0
                 
                 st.write(f"• Total Expenses: {format_money(total_expenses)}")
-                st.write(f"• Number of Expenses: {len(expenses)}")
+                st.write(f"• Number of Expenses: {expense_count}")
                 st.write(f"• Average per Expense: {format_money(avg_expense)}")
                 st.write(f"• Daily Average: {format_money(daily_avg)}")
             
             # Charts using matplotlib
-            if category_totals:
+            if not category_totals.empty:
                 import matplotlib.pyplot as plt
                 
                 col1, col2 = st.columns(2)
@@ -241,8 +270,8 @@ def show_expense_analysis():
                 with col1:
                     # Pie chart
                     fig, ax = plt.subplots(figsize=(8, 6))
-                    categories = list(category_totals.keys())
-                    amounts = list(category_totals.values())
+                    categories = list(category_totals.index)
+                    amounts = list(category_totals)
                     
                     ax.pie(amounts, labels=categories, autopct='%1.1f%%', startangle=90)
                     ax.set_title('Expenses by Category')
@@ -251,8 +280,8 @@ def show_expense_analysis():
                 with col2:
                     # Bar chart
                     fig, ax = plt.subplots(figsize=(8, 6))
-                    categories = list(category_totals.keys())
-                    amounts = list(category_totals.values())
+                    categories = list(category_totals.index)
+                    amounts = list(category_totals)
                     
                     ax.bar(categories, amounts)
                     ax.set_title('Expense Amounts by Category')
@@ -263,14 +292,19 @@ def show_expense_analysis():
             
             # Top expenses
             st.subheader("💸 Largest Expenses")
-            top_expenses = sorted(expenses, key=lambda x: x.amount, reverse=True)[:10]
+            top_expenses = session.query(Expense).filter(*date_filters).order_by(
+                Expense.amount.desc(), Expense.id
+            ).limit(10).all()
             
-            for i, expense in enumerate(top_expenses, 1):
-                st.write(f"{i}. **{expense.category}** - {format_money(expense.amount)} ({format_datetime(expense.created_at)})")
-                if expense.vendor:
-                    st.write(f"   Vendor: {expense.vendor}")
-                if expense.note:
-                    st.write(f"   Note: {expense.note}")
+            top_table = pd.DataFrame([{
+                'Category': expense.category,
+                'Amount': format_money(expense.amount),
+                'Date': format_datetime(expense.created_at),
+                'Vendor': expense.vendor or '',
+                'Note': expense.note or ''
+            } for expense in top_expenses])
+            top_table.index = range(1, len(top_table) + 1)
+            st.dataframe(top_table, use_container_width=True)
         
         finally:
             session.close()
@@ -3,6 +3,7 @@ Inventory Management Page
 """
 
 import streamlit as st
+import pandas as pd
 from datetime import datetime
 from hydrohub.models import InventoryItem
 from hydrohub.db import get_session
@@ -27,84 +28,102 @@ def show_inventory_page(user, permissions):
     with tab3:
         show_adjust_stock_form(user)
 
-def show_current_inventory():
-    """Display current inventory status"""
+@st.cache_data(ttl=60, show_spinner=False)
+def _load_inventory_snapshot():
+    """Inventory table and aggregates for the current inventory tab
+    
+    Cached across reruns; the add and adjust forms clear it after a commit.
+    Returns None when there are no items.
+    """
     session = get_session()
     try:
-        items = session.query(InventoryItem).all()
-        
-        if not items:
-            st.info("No inventory items found. Add some items to get started.")
-            return
-        
-        # Summary metrics
-        col1, col2, col3, col4 = st.columns(4)
-        
-        total_items = len(items)
-        total_value = sum(item.quantity * item.unit_cost for item in items)
-        low_stock_items = [item for item in items if item.quantity <= 10]
-        categories = len(set(item.category for item in items))
-        
-        with col1:
-            st.metric("Total Items", total_items)
-        with col2:
-            st.metric("Total Value", format_money(total_value))
-        with col3:
-            st.metric("Low Stock Items", len(low_stock_items))
-        with col4:
-            st.metric("Categories", categories)
-        
-        # Low stock alerts
-        if low_stock_items:
-            st.warning("⚠️ **Low Stock Alert**")
-            for item in low_stock_items:
-                st.write(f"• {item.name}: {item.quantity} {item.category}")
-        
-        # Inventory table
-        st.subheader("📋 Inventory Items")
-        
-        # Prepare data for display
-        inventory_data = []
-        for item in items:
-            inventory_data.append({
-                'ID': item.id,
-                'Name': item.name,
-                'Category': item.category,
-                'Quantity': item.quantity,
-                'Unit Cost': format_money(item.unit_cost),
-                'Total Value': format_money(item.quantity * item.unit_cost),
-                'Location': item.location or 'N/A',
-                'Last Updated': item.last_updated.strftime('%Y-%m-%d %H:%M')
-            })
-        
-        # Display table
-        if inventory_data:
-            st.dataframe(inventory_data, use_container_width=True)
-        
-        # Category breakdown chart
-        if items:
-            st.subheader("📊 Inventory by Category")
-            category_data = {}
-            for item in items:
-                if item.category not in category_data:
-                    category_data[item.category] = {'quantity': 0, 'value': 0}
-                category_data[item.category]['quantity'] += item.quantity
-                category_data[item.category]['value'] += item.quantity * item.unit_cost
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.write("**Quantity by Category**")
-                for category, data in category_data.items():
-                    st.write(f"• {category}: {data['quantity']} items")
-            
-            with col2:
-                st.write("**Value by Category**")
-                for category, data in category_data.items():
-                    st.write(f"• {category}: {format_money(data['value'])}")
-        
+        rows = session.query(
+            InventoryItem.id, InventoryItem.name, InventoryItem.category,
+            InventoryItem.quantity, InventoryItem.unit_cost,
+            InventoryItem.location, InventoryItem.last_updated
+        ).all()
     finally:
         session.close()
+    
+    if not rows:
+        return None
+    
+    items = pd.DataFrame(rows, columns=['id', 'name', 'category', 'quantity', 'unit_cost', 'location', 'last_updated'])
+    items['value'] = items['quantity'] * items['unit_cost']
+    # Categories repeat across items; group on the categorical codes
+    items['category'] = items['category'].astype('category')
+    
+    low_stock = items.loc[items['quantity'] <= 10, ['name', 'quantity', 'category']]
+    category_totals = items.groupby('category', observed=True)[['quantity', 'value']].sum()
+    
+    return {
+        'total_items': len(items),
+        'total_value': items['value'].sum(),
+        'categories': items['category'].nunique(),
+        'low_stock': list(low_stock.itertuples(index=False, name=None)),
+        'inventory_data': pd.DataFrame({
+            'ID': items['id'],
+            'Name': items['name'],
+            'Category': items['category'],
+            'Quantity': items['quantity'],
+            'Unit Cost': items['unit_cost'].map(format_money),
+            'Total Value': items['value'].map(format_money),
+            'Location': items['location'].mask(items['location'].fillna('') == '', 'N/A'),
+            'Last Updated': pd.to_datetime(items['last_updated']).dt.strftime('%Y-%m-%d %H:%M')
+        }),
+        'category_data': {
+            category: {'quantity': quantity, 'value': value}
+            for category, quantity, value in category_totals.itertuples()
+        }
+    }
+
+def show_current_inventory():
+    """Display current inventory status"""
+    snapshot = _load_inventory_snapshot()
+    
+    if snapshot is None:
+        st.info("No inventory items found. Add some items to get started.")
+        return
+    
+    # Summary metrics
+    col1, col2, col3, col4 = st.columns(4)
+    
+    low_stock_items = snapshot['low_stock']
+    
+    with col1:
+        st.metric("Total Items", snapshot['total_items'])
+    with col2:
+        st.metric("Total Value", format_money(snapshot['total_value']))
+    with col3:
+        st.metric("Low Stock Items", len(low_stock_items))
+    with col4:
+        st.metric("Categories", snapshot['categories'])
+    
+    # Low stock alerts
+    if low_stock_items:
+        st.warning("⚠️ **Low Stock Alert**")
+        for name, quantity, category in low_stock_items:
+            st.write(f"• {name}: {quantity} {category}")
+    
+    # Inventory table
+    st.subheader("📋 Inventory Items")
+    st.dataframe(snapshot['inventory_data'], use_container_width=True)
+    
+    # Category breakdown chart
+    st.subheader("📊 Inventory by Category")
+    category_data = snapshot['category_data']
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.write("**Quantity by Category**")
+        for category, data in category_data.items():
+            st.write(f"• {category}: {data['quantity']} items")
+    
+    with col2:
+        st.write("**Value by Category**")
+        for category, data in category_data.items():
+            st.write(f"• {category}: {format_money(data['value'])}")
 
 def show_add_item_form(user):
     """Display add new inventory item form"""
@@ -144,7 +163,7 @@ def show_add_item_form(user):
                     item = InventoryItem(**validated_data)
                     session.add(item)
                     session.commit()
-                    session.refresh(item)
+                    _load_inventory_snapshot.clear()
                     
                     # Log to ledger
                     log_inventory_change(
@@ -155,7 +174,8 @@ def show_add_item_form(user):
                             'change_type': 'item_added',
                             'quantity': item.quantity,
                             'unit_cost': item.unit_cost
-                        }
+                        },
+                        session=session
                     )
                     
                     show_success_message(
@@ -235,6 +255,7 @@ def show_adjust_stock_form(user):
                             item.quantity = max(0, new_quantity)
                             item.last_updated = get_current_time()
                             session.commit()
+                            _load_inventory_snapshot.clear()
                             
                             # Log to ledger
                             log_inventory_change(
@@ -247,7 +268,8 @@ def show_adjust_stock_form(user):
                                     'new_quantity': item.quantity,
                                     'adjustment_amount': adjustment_amount,
                                     'reason': reason
-                                }
+                                },
+                                session=session
                             )
                             
                             show_success_message(
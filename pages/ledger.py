@@ -7,7 +7,11 @@ import json
 from datetime import datetime, date
 from hydrohub.models import Ledger, User
 from hydrohub.db import get_session
-from hydrohub.ledger import verify_ledger, get_ledger_entries, export_ledger_proof, get_ledger_stats
+from hydrohub.auth import Perm
+from hydrohub.ledger import (
+    verify_ledger, get_ledger_entries, export_ledger_proof, get_ledger_stats, verify_ledger_proof,
+    format_ledger_message
+)
 from hydrohub.ui_components import (
     show_error_message, show_success_message, show_date_range_picker
 )
@@ -15,7 +19,7 @@ from hydrohub.utils import format_datetime
 
 def show_ledger_page(user, permissions):
     """Display ledger management page (Admin only)"""
-    if not permissions['can_view_ledger']:
+    if not permissions & Perm.VIEW_LEDGER:
         show_error_message("Access Denied", "You don't have permission to view the ledger.")
         return
     
@@ -107,8 +111,9 @@ def show_recent_entries():
                     data = json.loads(entry.data_text)
                     st.write("**Data:**")
                     
-                    if 'human_message' in data:
-                        st.info(f"📝 {data['human_message']}")
+                    message = format_ledger_message(data)
+                    if message:
+                        st.info(f"📝 {message}")
                     
                     if 'payload' in data:
                         st.json(data['payload'])
@@ -400,19 +405,7 @@ def show_export_ledger(user):
                 
                 if 'proof_hash' in data and 'entries' in data:
                     # Verify the proof hash
-                    entries_json = json.dumps({
-                        'export_timestamp': data['export_timestamp'],
-                        'filter_start_date': data.get('filter_start_date'),
-                        'filter_end_date': data.get('filter_end_date'),
-                        'total_entries': data['total_entries'],
-                        'entries': data['entries'],
-                        'verification_info': data['verification_info']
-                    }, sort_keys=True, separators=(',', ':'))
-                    
-                    import hashlib
-                    computed_hash = hashlib.sha256(entries_json.encode('utf-8')).hexdigest()
-                    
-                    if computed_hash == data['proof_hash']:
+                    if verify_ledger_proof(data):
                         st.success("✅ Export verification successful!")
                         st.info(f"📊 Verified {data['total_entries']} entries")
                     else:
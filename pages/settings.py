@@ -8,15 +8,15 @@ import sys
 import platform
 from datetime import datetime
 from hydrohub.db import get_db_stats, get_session
-from hydrohub.storage import get_storage_stats
+from hydrohub.storage import get_storage_stats, MAX_FILE_SIZE_MB
 from hydrohub.ledger import get_ledger_stats, log_system_event
-from hydrohub.auth import update_user_password
+from hydrohub.auth import update_user_password, Perm
 from hydrohub.ui_components import show_error_message, show_success_message
 from hydrohub.utils import get_business_config, format_money
 
 def show_settings_page(user, permissions):
     """Display settings management page (Admin only)"""
-    if not permissions['can_manage_settings']:
+    if not permissions & Perm.MANAGE_SETTINGS:
         show_error_message("Access Denied", "You don't have permission to manage settings.")
         return
     
@@ -297,7 +297,7 @@ def show_storage_settings():
     # Storage settings
     st.subheader("⚙️ Storage Configuration")
     
-    current_max_size = int(os.getenv('MAX_FILE_SIZE_MB', '5'))
+    current_max_size = MAX_FILE_SIZE_MB
     
     with st.form("storage_settings_form"):
         new_max_size = st.number_input("Maximum File Size (MB)", 
@@ -464,11 +464,12 @@ def perform_health_check():
         db_stats = get_db_stats()
         st.success("✅ Database: Connected")
         
-        # Check ledger integrity
+        # Check ledger integrity (entries added since the last clean run;
+        # the Ledger page runs the full verification)
         from hydrohub.ledger import verify_ledger
-        errors = verify_ledger()
+        errors = verify_ledger(incremental=True)
         if not errors:
-            st.success("✅ Ledger: Integrity verified")
+            st.success("✅ Ledger: Entries since the last check verified (full verification on the Ledger page)")
         else:
             st.error(f"❌ Ledger: {len(errors)} integrity issues found")
         
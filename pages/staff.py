@@ -3,12 +3,13 @@ Staff Management Page (Admin Only)
 """
 
 import streamlit as st
-from datetime import datetime, date
+from datetime import date
 from hydrohub.models import User, RefillTransaction, Expense
 from hydrohub.db import get_session
-from hydrohub.auth import create_user, delete_user, update_user_password
+from hydrohub.auth import create_user, delete_user, update_user_password, Perm
 from hydrohub.validations import validate_user_data, ValidationError
 from hydrohub.ledger import log_user_action
+from hydrohub.reports import get_staff_performance_report
 from hydrohub.ui_components import (
     show_error_message, show_success_message, show_confirmation_modal,
     show_role_badge, show_date_range_picker
@@ -17,7 +18,7 @@ from hydrohub.utils import format_money, format_datetime
 
 def show_staff_page(user, permissions):
     """Display staff management page (Admin only)"""
-    if not permissions['can_manage_users']:
+    if not permissions & Perm.MANAGE_USERS:
         show_error_message("Access Denied", "You don't have permission to manage staff.")
         return
     
@@ -178,102 +179,76 @@ def show_staff_performance():
     start_date, end_date = show_date_range_picker("performance")
     
     if st.button("Generate Performance Report"):
-        session = get_session()
-        try:
-            # Get all staff members
-            staff_members = session.query(User).filter(User.role.in_(['admin', 'staff'])).all()
-            
-            if not staff_members:
-                st.info("No staff members found.")
-                return
-            
-            # Date range for queries
-            start_datetime = datetime.combine(start_date, datetime.min.time())
-            end_datetime = datetime.combine(end_date, datetime.max.time())
-            
-            performance_data = []
+        # Per-staff totals come from the grouped report queries rather
+        # than two queries per staff member
+        report = get_staff_performance_report(start_date, end_date)
+        
+        if not report['staff_performance']:
+            st.info("No staff members found.")
+            return
+        
+        performance_data = []
+        
+        for username, stats in report['staff_performance'].items():
+            total_sales = stats['transactions']['total_revenue']
+            total_expenses = stats['expenses']['total_amount']
             
-            for staff in staff_members:
-                # Get transactions
-                transactions = session.query(RefillTransaction).filter(
-                    RefillTransaction.staff_id == staff.id,
-                    RefillTransaction.created_at >= start_datetime,
-                    RefillTransaction.created_at <= end_datetime
-                ).all()
-                
-                # Get expenses
-                expenses = session.query(Expense).filter(
-                    Expense.staff_id == staff.id,
-                    Expense.created_at >= start_datetime,
-                    Expense.created_at <= end_datetime
-                ).all()
+            performance_data.append({
+                'username': username,
+                'transactions_count': stats['transactions']['count'],
+                'total_sales': total_sales,
+                'total_gallons': stats['transactions']['total_gallons'],
+                'expenses_count': stats['expenses']['count'],
+                'total_expenses': total_expenses,
+                'net_contribution': total_sales - total_expenses
+            })
+        
+        # Sort by total sales
+        performance_data.sort(key=lambda x: x['total_sales'], reverse=True)
+        
+        # Display performance table
+        st.subheader("🏆 Performance Rankings")
+        
+        for i, data in enumerate(performance_data, 1):
+            with st.expander(f"#{i} {data['username']} - {format_money(data['total_sales'])} sales"):
+                col1, col2, col3 = st.columns(3)
                 
-                # Calculate metrics
-                total_sales = sum(t.total_amount for t in transactions)
-                total_gallons = sum(t.gallons_count for t in transactions)
-                total_expenses = sum(e.amount for e in expenses)
+                with col1:
+                    st.write("**Sales Performance**")
+                    st.write(f"• Transactions: {data['transactions_count']}")
+                    st.write(f"• Total Sales: {format_money(data['total_sales'])}")
+                    st.write(f"• Gallons Sold: {data['total_gallons']}")
                 
-                performance_data.append({
-                    'staff': staff,
-                    'transactions_count': len(transactions),
-                    'total_sales': total_sales,
-                    'total_gallons': total_gallons,
-                    'expenses_count': len(expenses),
-                    'total_expenses': total_expenses,
-                    'net_contribution': total_sales - total_expenses
-                })
-            
-            # Sort by total sales
-            performance_data.sort(key=lambda x: x['total_sales'], reverse=True)
-            
-            # Display performance table
-            st.subheader("🏆 Performance Rankings")
-            
-            for i, data in enumerate(performance_data, 1):
-                staff = data['staff']
+                with col2:
+                    st.write("**Expense Management**")
+                    st.write(f"• Expenses Recorded: {data['expenses_count']}")
+                    st.write(f"• Total Expenses: {format_money(data['total_expenses'])}")
                 
-                with st.expander(f"#{i} {staff.username} - {format_money(data['total_sales'])} sales"):
-                    col1, col2, col3 = st.columns(3)
-                    
-                    with col1:
-                        st.write("**Sales Performance**")
-                        st.write(f"• Transactions: {data['transactions_count']}")
-                        st.write(f"• Total Sales: {format_money(data['total_sales'])}")
-                        st.write(f"• Gallons Sold: {data['total_gallons']}")
-                    
-                    with col2:
-                        st.write("**Expense Management**")
-                        st.write(f"• Expenses Recorded: {data['expenses_count']}")
-                        st.write(f"• Total Expenses: {format_money(data['total_expenses'])}")
+                with col3:
+                    st.write("**Net Contribution**")
+                    net_contribution = data['net_contribution']
+                    color = "🟢" if net_contribution >= 0 else "🔴"
+                    st.write(f"• {color} {format_money(net_contribution)}")
                     
-                    with col3:
-                        st.write("**Net Contribution**")
-                        net_contribution = data['net_contribution']
-                        color = "🟢" if net_contribution >= 0 else "🔴"
-                        st.write(f"• {color} {format_money(net_contribution)}")
-                        
-                        if data['transactions_count'] > 0:
-                            avg_sale = data['total_sales'] / data['transactions_count']
-                            st.write(f"• Avg Sale: {format_money(avg_sale)}")
-            
-            # Summary statistics
-            st.subheader("📈 Team Summary")
-            
-            total_team_sales = sum(d['total_sales'] for d in performance_data)
-            total_team_transactions = sum(d['transactions_count'] for d in performance_data)
-            total_team_expenses = sum(d['total_expenses'] for d in performance_data)
-            
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.metric("Team Sales", format_money(total_team_sales))
-            with col2:
-                st.metric("Team Transactions", total_team_transactions)
-            with col3:
-                st.metric("Team Net", format_money(total_team_sales - total_team_expenses))
+                    if data['transactions_count'] > 0:
+                        avg_sale = data['total_sales'] / data['transactions_count']
+                        st.write(f"• Avg Sale: {format_money(avg_sale)}")
         
-        finally:
-            session.close()
+        # Summary statistics
+        st.subheader("📈 Team Summary")
+        
+        total_team_sales = sum(d['total_sales'] for d in performance_data)
+        total_team_transactions = sum(d['transactions_count'] for d in performance_data)
+        total_team_expenses = sum(d['total_expenses'] for d in performance_data)
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.metric("Team Sales", format_money(total_team_sales))
+        with col2:
+            st.metric("Team Transactions", total_team_transactions)
+        with col3:
+            st.metric("Team Net", format_money(total_team_sales - total_team_expenses))
 
 def show_manage_staff(user):
     """Display staff management tools"""
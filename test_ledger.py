@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Test ledger appends and chain verification
+"""
+
+from sqlalchemy import update
+
+def _setup():
+    """Create the tables and return the ledger module"""
+    from hydrohub.db import init_db
+    from hydrohub import ledger
+    
+    init_db()
+    return ledger
+
+def _get_checkpoint():
+    """The saved verification checkpoint as (last_verified_id, last_verified_hash)"""
+    from hydrohub.db import get_session
+    from hydrohub.models import LedgerCheckpoint
+    
+    session = get_session()
+    try:
+        checkpoint = session.get(LedgerCheckpoint, 1)
+        return (checkpoint.last_verified_id, checkpoint.last_verified_hash) if checkpoint else None
+    finally:
+        session.close()
+
+def _set_data_text(entry_id, data_text):
+    """Overwrite an entry's stored data_text, bypassing the ledger API"""
+    from hydrohub.db import engine
+    from hydrohub.models import Ledger
+    
+    with engine.begin() as connection:
+        connection.execute(update(Ledger).where(Ledger.id == entry_id).values(data_text=data_text))
+
+def test_incremental_verify_checkpoint():
+    """Test that only incremental runs move the checkpoint, and what they cover"""
+    print("Testing incremental ledger verification...")
+    ledger = _setup()
+    
+    first = ledger.add_ledger_entry(None, 'system_event', {'event': 'test_start'})
+    
+    # A clean incremental run checkpoints the tail
+    assert ledger.verify_ledger(incremental=True) == []
+    assert _get_checkpoint() == (first.id, first.data_hash)
+    
+    # A full run only reads: the checkpoint stays where it was
+    second = ledger.add_ledger_entry(1, 'system_event', {'event': 'test_next'})
+    assert ledger.verify_ledger() == []
+    assert _get_checkpoint() == (first.id, first.data_hash)
+    
+    # Tampering after the checkpoint is caught by the next incremental run
+    original_text = ledger.get_ledger_entries(limit=1)[0].data_text
+    _set_data_text(second.id, original_text.replace('test_next', 'tampered'))
+    errors = ledger.verify_ledger(incremental=True)
+    assert [e['error'] for e in errors] == ['hash_mismatch'] and errors[0]['entry_id'] == second.id
+    assert _get_checkpoint() == (first.id, first.data_hash)
+    _set_data_text(second.id, original_text)
+    
+    # Entries at or below the checkpoint are only rechecked by a full run
+    assert ledger.verify_ledger(incremental=True) == []
+    assert _get_checkpoint() == (second.id, second.data_hash)
+    first_text = ledger.get_ledger_entries(limit=1, before_id=second.id)[0].data_text
+    _set_data_text(first.id, first_text.replace('test_start', 'tampered'))
+    try:
+        assert ledger.verify_ledger(incremental=True) == []
+        assert [e['entry_id'] for e in ledger.verify_ledger()] == [first.id]
+    finally:
+        _set_data_text(first.id, first_text)
+    
+    assert ledger.verify_ledger() == []
+    print("✅ Incremental verification checks only entries after the checkpoint")
+
+def test_add_ledger_entries_batch():
+    """Test that a batch append chains its entries and returns them in input order"""
+    print("Testing batched ledger appends...")
+    ledger = _setup()
+    
+    tail = ledger.get_last_hash()
+    # actor_id=None interleaved with a user id, which the ORM bulk path would split
+    entries = [
+        {'actor_id': None, 'action_type': 'system_event', 'data_dict': {'event_type': 'batch', 'n': 0}},
+        {'actor_id': 1, 'action_type': 'user_action', 'data_dict': {'action': 'batch', 'n': 1}},
+        {'actor_id': None, 'action_type': 'system_event', 'data_dict': {'event_type': 'batch', 'n': 2}},
+        {'actor_id': 1, 'action_type': 'user_action', 'data_dict': {'action': 'batch', 'n': 3}},
+        {'actor_id': 1, 'action_type': 'user_action', 'data_dict': {'action': 'batch', 'n': 4}},
+    ]
+    refs = ledger.add_ledger_entries(entries)
+    
+    # One ref per entry, with ids ascending in input order
+    assert len(refs) == len(entries)
+    assert [ref.id for ref in refs] == list(range(refs[0].id, refs[0].id + len(entries)))
+    
+    # Each stored row matches its ref and chains onto the one before it
+    stored = {row.id: row for row in ledger.get_ledger_entries(limit=len(entries))}
+    prev_hash = tail
+    for ref, entry in zip(refs, entries):
+        row = stored[ref.id]
+        assert row.data_hash == ref.data_hash
+        assert row.prev_hash == prev_hash
+        assert row.actor_id == entry['actor_id']
+        assert row.action_type == entry['action_type']
+        prev_hash = ref.data_hash
+    
+    assert ledger.get_last_hash() == refs[-1].data_hash
+    assert ledger.add_ledger_entries([]) == []
+    assert ledger.verify_ledger() == []
+    print("✅ Batched appends chain in order and verify cleanly")
+
+def test_append_reads_tail_in_transaction():
+    """Test that an append reads the chain tail under the write lock it inserts with"""
+    print("Testing ledger tail read inside the append transaction...")
+    import sqlite3
+    from hydrohub.db import engine, get_session
+    ledger = _setup()
+    
+    # Try to start a write from another connection whenever the tail is read
+    get_last_hash = ledger.get_last_hash
+    tail_reads = []
+    
+    def probing_get_last_hash(session=None):
+        tail = get_last_hash(session)
+        other = sqlite3.connect(engine.url.database, timeout=0)
+        try:
+            other.execute("BEGIN IMMEDIATE")
+            other.rollback()
+            tail_reads.append((tail, 'unlocked'))
+        except sqlite3.OperationalError:
+            tail_reads.append((tail, 'locked'))
+        finally:
+            other.close()
+        return tail
+    
+    cache_last_hash = ledger.CACHE_LAST_HASH
+    ledger.CACHE_LAST_HASH = False
+    ledger.get_last_hash = probing_get_last_hash
+    session = get_session()
+    try:
+        first = ledger.add_ledger_entry(None, 'system_event', {'event_type': 'tail_test'})
+        second = ledger.add_ledger_entry(1, 'system_event', {'event_type': 'tail_test'}, session=session)
+    finally:
+        session.close()
+        ledger.get_last_hash = get_last_hash
+        ledger.CACHE_LAST_HASH = cache_last_hash
+        ledger._invalidate_last_hash()
+    
+    # Both appends, with their own session and the caller's, read the tail
+    # while holding the write lock, and chain onto what they read
+    assert [state for _, state in tail_reads] == ['locked', 'locked']
+    assert tail_reads[1][0] == first.data_hash
+    assert ledger.get_ledger_entries(limit=1)[0].prev_hash == first.data_hash
+    assert ledger.get_last_hash() == second.data_hash
+    assert ledger.verify_ledger() == []
+    print("✅ Appends read the tail inside their own write transaction")
+
+def main():
+    """Run all ledger tests"""
+    print("🔧 Testing HydroHub Ledger")
+    print("=" * 35)
+    
+    test_incremental_verify_checkpoint()
+    test_add_ledger_entries_batch()
+    test_append_reads_tail_in_transaction()
+    
+    print("\n" + "=" * 35)
+    print("🎉 All ledger tests passed!")
+
+if __name__ == "__main__":
+    import conftest  # Use a throwaway database when run directly
+    main()
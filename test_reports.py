@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Test the report aggregations against known transactions and expenses
+"""
+
+from datetime import date, datetime, time
+
+# A period no other test writes to, so the totals are known exactly
+PERIOD_START = date(2001, 3, 1)
+PERIOD_END = date(2001, 3, 3)
+
+def _add(*records):
+    """Insert records in one commit and return their ids"""
+    from hydrohub.db import get_session
+    
+    session = get_session()
+    try:
+        session.add_all(records)
+        session.commit()
+        return [record.id for record in records]
+    finally:
+        session.close()
+
+def _find_user(username):
+    """Id of the user with this username, if any"""
+    from sqlalchemy import select
+    from hydrohub.db import get_session
+    from hydrohub.models import User
+    
+    session = get_session()
+    try:
+        return session.execute(select(User.id).where(User.username == username)).scalar_one_or_none()
+    finally:
+        session.close()
+
+def _setup():
+    """Create the tables and, once, a staff member with activity in the test period"""
+    from hydrohub.db import init_db
+    from hydrohub.models import User, RefillTransaction, Expense
+    
+    init_db()
+    if _find_user('report_tester'):
+        return
+    
+    staff_id, = _add(User(username='report_tester', password_hash='unused', role='staff'))
+    
+    # Rows just outside the period on both sides check the date bounds
+    _add(
+        RefillTransaction(gallons_count=1, price_per_gallon=25.0, total_amount=25.0, payment_type='Cash',
+                          staff_id=staff_id, created_at=datetime(2001, 2, 28, 23, 59, 59)),
+        RefillTransaction(gallons_count=2, price_per_gallon=25.0, total_amount=50.0, payment_type='Cash',
+                          staff_id=staff_id, created_at=datetime(2001, 3, 1, 0, 0, 0)),
+        RefillTransaction(gallons_count=3, price_per_gallon=25.0, total_amount=75.0, payment_type='GCash',
+                          staff_id=staff_id, created_at=datetime(2001, 3, 3, 23, 59, 59, 500000)),
+        RefillTransaction(gallons_count=10, price_per_gallon=25.0, total_amount=250.0, payment_type='Cash',
+                          staff_id=staff_id, created_at=datetime(2001, 3, 4, 0, 0, 0)),
+        Expense(category='Supplies', amount=30.0, staff_id=staff_id, created_at=datetime(2001, 3, 1, 10, 0)),
+        Expense(category='Supplies', amount=20.0, staff_id=staff_id, created_at=datetime(2001, 3, 3, 12, 0)),
+        Expense(category='Filters', amount=15.5, staff_id=staff_id, created_at=datetime(2001, 3, 2, 8, 30)),
+        Expense(category='Filters', amount=100.0, staff_id=staff_id, created_at=datetime(2001, 3, 4, 0, 0)),
+    )
+
+def test_sales_and_expense_summaries():
+    """Test the SQL-aggregated sales and expense summaries"""
+    print("Testing sales and expense summaries...")
+    _setup()
+    from hydrohub.reports import get_sales_summary, get_expense_summary
+    
+    sales = get_sales_summary(PERIOD_START, PERIOD_END)
+    assert sales['period']['days'] == 3
+    assert sales['transactions']['total_count'] == 2
+    assert sales['transactions']['total_gallons'] == 5
+    assert sales['transactions']['total_revenue'] == 125.0
+    assert sales['transactions']['avg_price_per_gallon'] == 25.0
+    assert sales['payment_breakdown'] == {
+        'Cash': {'count': 1, 'amount': 50.0},
+        'GCash': {'count': 1, 'amount': 75.0}
+    }
+    
+    expenses = get_expense_summary(PERIOD_START, PERIOD_END)
+    assert expenses['expenses']['total_count'] == 3
+    assert expenses['expenses']['total_amount'] == 65.5
+    assert expenses['category_breakdown'] == {
+        'Supplies': {'count': 2, 'amount': 50.0},
+        'Filters': {'count': 1, 'amount': 15.5}
+    }
+    
+    # An empty range reports zeros rather than failing
+    empty = get_sales_summary(date(2001, 1, 1), date(2001, 1, 2))
+    assert empty['transactions']['total_count'] == 0
+    assert empty['transactions']['avg_price_per_gallon'] == 0
+    assert empty['payment_breakdown'] == {}
+    print("✅ Summaries match the inserted records")
+
+def test_inventory_report():
+    """Test the inventory category breakdown and overall totals"""
+    print("Testing inventory report...")
+    _setup()
+    from hydrohub.models import InventoryItem
+    from hydrohub.reports import get_inventory_report
+    
+    before = get_inventory_report()
+    _add(
+        InventoryItem(name='Test cap', category='Report Test', quantity=5, unit_cost=2.0),
+        InventoryItem(name='Test seal', category='Report Test', quantity=20, unit_cost=1.5),
+    )
+    after = get_inventory_report()
+    
+    assert after['category_breakdown']['Report Test'] == {'count': 2, 'quantity': 25, 'value': 40.0}
+    assert after['summary']['total_items'] == before['summary']['total_items'] + 2
+    assert after['summary']['total_value'] == before['summary']['total_value'] + 40.0
+    assert after['summary']['low_stock_count'] == before['summary']['low_stock_count'] + 1
+    print("✅ Inventory totals include the new category")
+
+def test_daily_sales_data():
+    """Test that each day of the window gets its own bucket"""
+    print("Testing daily sales data...")
+    _setup()
+    from hydrohub.models import RefillTransaction, Expense
+    from hydrohub.reports import get_daily_sales_data
+    
+    today = date.today()
+    before = get_daily_sales_data(3)
+    _add(
+        RefillTransaction(gallons_count=4, price_per_gallon=25.0, total_amount=100.0, payment_type='Cash',
+                          created_at=datetime.combine(today, time(12, 0))),
+        Expense(category='Other', amount=40.0, created_at=datetime.combine(today, time(12, 30))),
+    )
+    after = get_daily_sales_data(3)
+    
+    assert [day['date'] for day in after] == [date.fromordinal(today.toordinal() - i) for i in (2, 1, 0)]
+    assert after[:2] == before[:2]
+    assert after[-1]['transactions'] == before[-1]['transactions'] + 1
+    assert after[-1]['gallons'] == before[-1]['gallons'] + 4
+    assert after[-1]['revenue'] == before[-1]['revenue'] + 100.0
+    assert after[-1]['expenses'] == before[-1]['expenses'] + 40.0
+    assert after[-1]['profit'] == after[-1]['revenue'] - after[-1]['expenses']
+    print("✅ Daily sales data buckets activity by day")
+
+def test_staff_performance_report():
+    """Test per-staff totals, including staff with no activity"""
+    print("Testing staff performance report...")
+    _setup()
+    from hydrohub.reports import get_staff_performance_report
+    
+    performance = get_staff_performance_report(PERIOD_START, PERIOD_END)['staff_performance']
+    tester = performance['report_tester']
+    assert tester['role'] == 'staff'
+    assert tester['transactions'] == {'count': 2, 'total_gallons': 5, 'total_revenue': 125.0}
+    assert tester['expenses'] == {'count': 3, 'total_amount': 65.5}
+    
+    # The default admin had no activity in the period but is still listed
+    assert performance['admin']['transactions']['count'] == 0
+    assert performance['admin']['expenses'] == {'count': 0, 'total_amount': 0}
+    print("✅ Staff performance totals are grouped per user")
+
+def test_profit_loss_report():
+    """Test the P&L totals, and that they follow new records immediately"""
+    print("Testing profit and loss report...")
+    _setup()
+    from hydrohub.models import Expense
+    from hydrohub.reports import get_profit_loss_report
+    
+    report = get_profit_loss_report(PERIOD_START, PERIOD_END)
+    assert report['revenue'] == 125.0
+    assert report['expenses'] == 65.5
+    assert report['gross_profit'] == 59.5
+    assert round(report['gross_margin_percent'], 2) == 47.6
+    
+    _add(Expense(category='Other', amount=9.5, created_at=datetime(2001, 3, 2, 9, 0)))
+    updated = get_profit_loss_report(PERIOD_START, PERIOD_END)
+    assert updated['expenses'] == 75.0
+    assert updated['gross_profit'] == 50.0
+    print("✅ P&L report totals match the inserted records")
+
+def main():
+    """Run all report tests"""
+    print("🔧 Testing HydroHub Reports")
+    print("=" * 35)
+    
+    test_sales_and_expense_summaries()
+    test_inventory_report()
+    test_daily_sales_data()
+    test_staff_performance_report()
+    test_profit_loss_report()
+    
+    print("\n" + "=" * 35)
+    print("🎉 All report tests passed!")
+
+if __name__ == "__main__":
+    import conftest  # Use a throwaway database when run directly
+    main()